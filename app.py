@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 import os
 from utils.hybrid_manager import HybridManager
 from utils.analytics import Analytics
+from utils.data_manager import weekly_compliance
 from utils.mobile_nav import add_mobile_header
 
 # Configure page for mobile-first PWA
@@ -124,6 +125,9 @@ inject_mobile_enhancements()
 # Initialize data manager
 data_manager = HybridManager()
 
+# Days of history the home page loads for its latest-entry stats and tables
+RECENT_DAYS = 60
+
 def main():
     # Add mobile header with FontAwesome icon
     add_mobile_header("Fitness Tracker", "fas fa-dumbbell")
@@ -145,28 +149,40 @@ def main():
     # Quick stats in sidebar
     st.sidebar.subheader("📊 Quick Stats")
     
-    # Load recent data for quick stats
-    body_metrics = data_manager.load_body_metrics()
-    workout_data = data_manager.load_workout_data()
-    diet_data = data_manager.load_diet_data()
+    # Load recent data for quick stats; "this week" only needs the current month's shards
+    current_week = datetime.now().strftime("%Y-W%U")
+    today = datetime.now().date()
+    week_start = today - timedelta(days=(today.weekday() + 1) % 7)  # %U weeks start on Sunday
+    week_end = week_start + timedelta(days=6)  # entries planned ahead this week count too
+    # The home page only shows the latest entries, so load the last weeks before each table's newest row.
+    # Sheets has no cheap max date, but it keeps whole tables cached, so those load in full.
+    latest_dates = data_manager.get_latest_dates()
+    recent_start = {}
+    if latest_dates is not None:
+        for table, max_date in latest_dates.items():
+            recent_start[table] = pd.to_datetime(max_date).date() - timedelta(days=RECENT_DAYS) if max_date else today
+    body_metrics = data_manager.load_body_metrics(start=recent_start.get('body_metrics'))
+    workout_data = data_manager.load_workout_data(start=recent_start.get('workout_data'), columns=['date', 'day', 'workout_type', 'completed'])
+    diet_data = data_manager.load_diet_data(start=recent_start.get('diet_data'), columns=['date'])
+    week_workouts = data_manager.load_workout_data(start=week_start, end=week_end)
+    week_diet = data_manager.load_diet_data(start=week_start, end=week_end)
+    week_workouts = week_workouts[week_workouts['week'] == current_week] if not week_workouts.empty else pd.DataFrame()
+    week_diet = week_diet[week_diet['week'] == current_week] if not week_diet.empty else pd.DataFrame()
     
     if not body_metrics.empty:
         latest_weight = body_metrics['weight'].iloc[-1]
         latest_fat_pct = body_metrics['fat_percentage'].iloc[-1]
-        st.sidebar.metric("Current Weight", f"{latest_weight} kg")
-        st.sidebar.metric("Current Fat %", f"{latest_fat_pct}%")
+        st.sidebar.metric("Current Weight", f"{latest_weight:.1f} kg")
+        st.sidebar.metric("Current Fat %", f"{latest_fat_pct:.1f}%")
         
         # Calculate week compliance
-        current_week = datetime.now().strftime("%Y-W%U")
-        week_workouts = workout_data[workout_data['week'] == current_week] if not workout_data.empty else pd.DataFrame()
-        week_diet = diet_data[diet_data['week'] == current_week] if not diet_data.empty else pd.DataFrame()
-        
+        week_compliance = weekly_compliance(week_workouts, week_diet)
         if not week_workouts.empty:
-            workout_compliance = (week_workouts['completed'].sum() / len(week_workouts)) * 100
+            workout_compliance = week_compliance.loc[current_week, 'workout_compliance']
             st.sidebar.metric("This Week's Workout Compliance", f"{workout_compliance:.0f}%")
         
         if not week_diet.empty:
-            diet_compliance = week_diet['adherence_score'].mean() * 20  # Convert 1-5 scale to percentage
+            diet_compliance = week_compliance.loc[current_week, 'diet_compliance']
             st.sidebar.metric("This Week's Diet Compliance", f"{diet_compliance:.0f}%")
     else:
         st.sidebar.info("No data yet. Start tracking your progress!")
@@ -179,7 +195,6 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    current_week = datetime.now().strftime("%Y-W%U")
     st.info(f"📆 Week: {current_week}")
     
     # Show current week's plan in a mobile-friendly format
@@ -188,11 +203,10 @@ def main():
     
     # Create workout progress cards
     for day, plan in weekly_plan.items():
-        completed_workouts = workout_data[
-            (workout_data['week'] == current_week) & 
-            (workout_data['day'] == day) & 
-            (workout_data['completed'] == True)
-        ] if not workout_data.empty else pd.DataFrame()
+        completed_workouts = week_workouts[
+            (week_workouts['day'] == day) & 
+            (week_workouts['completed'] == True)
+        ] if not week_workouts.empty else pd.DataFrame()
         
         status = "✅" if not completed_workouts.empty else "⭕"
         status_color = "#4ECDC4" if not completed_workouts.empty else "#E0E0E0"
@@ -340,9 +354,17 @@ def main():
                     with col2:
                         st.write(f"{file_info['row_count']} records")
                     with col3:
-                        st.write(f"{file_info['size']} size")
+                        st.write(f"{file_info['size_bytes'] / 1024:.1f} KB")
+                    if file_info.get('min_date'):
+                        st.caption(f"{file_info['min_date']} → {file_info['max_date']}")
             else:
                 st.write("No data files found.")
+            
+            if 'replication' in storage_info:
+                replication = storage_info['replication']
+                st.write(f"**Waiting to sync to Google Sheets:** {replication['pending_changes']} changes")
+                if replication['last_error']:
+                    st.warning(f"Last sync failed: {replication['last_error']}")
     
     # Export and Reset functionality
     col1, col2 = st.columns(2)
@@ -352,7 +374,7 @@ def main():
         if not body_metrics.empty or not workout_data.empty or not diet_data.empty:
             if st.button("📤 Export All Data", key="export_btn", use_container_width=True):
                 if not body_metrics.empty:
-                    csv = body_metrics.to_csv(index=False)
+                    csv = data_manager.load_body_metrics().to_csv(index=False)
                     st.download_button(
                         label="📥 Download Body Metrics CSV",
                         data=csv,
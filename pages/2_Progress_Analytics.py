@@ -3,7 +3,8 @@ import pandas as pd
 from datetime import datetime, timedelta
 from utils.hybrid_manager import HybridManager
 from utils.analytics import Analytics
-from utils.mobile_nav import add_mobile_header
+from utils.data_manager import build_weekly_summary
+from utils.mobile_nav import add_mobile_header, estimate_viewport_width
 
 # Configure page for mobile
 st.set_page_config(
@@ -84,10 +85,9 @@ def main():
     # Add mobile header with FontAwesome icon
     add_mobile_header("Progress Analytics", "fas fa-chart-line")
     
-    # Load data
-    body_metrics = data_manager.load_body_metrics()
-    workout_data = data_manager.load_workout_data()
-    diet_data = data_manager.load_diet_data()
+    # Load data once; every chart and tab below works from this snapshot
+    snapshot = analytics.use_data(*data_manager.load_all())
+    body_metrics, workout_data, diet_data = snapshot.body_metrics, snapshot.workout_data, snapshot.diet_data
     
     # Check if we have any data
     if body_metrics.empty and workout_data.empty and diet_data.empty:
@@ -155,25 +155,40 @@ def main():
     # Charts section
     st.markdown("---")
     
+    # Long histories are thinned to about a point per pixel; narrowing the range shows every entry
+    viewport_width = estimate_viewport_width()
+    chart_start, chart_end = None, None
+    tracked_dates = body_metrics['date'].dropna() if not body_metrics.empty else pd.Series(dtype='datetime64[ns]')
+    if not tracked_dates.empty:
+        first_date, last_date = tracked_dates.min().date(), tracked_dates.max().date()
+        date_range = st.date_input(
+            "Chart date range",
+            value=(first_date, last_date),
+            min_value=first_date,
+            max_value=last_date
+        )
+        if len(date_range) == 2 and tuple(date_range) != (first_date, last_date):
+            chart_start, chart_end = date_range
+    
     # Weight and Fat Percentage Charts
     col1, col2 = st.columns(2)
     
     with col1:
-        weight_chart = analytics.create_weight_progress_chart()
+        weight_chart = analytics.create_weight_progress_chart(viewport_width, chart_start, chart_end)
         if weight_chart:
             st.plotly_chart(weight_chart, use_container_width=True)
         else:
             st.info("📊 Weight chart will appear here once you enter body metrics")
     
     with col2:
-        fat_chart = analytics.create_fat_percentage_chart()
+        fat_chart = analytics.create_fat_percentage_chart(viewport_width, chart_start, chart_end)
         if fat_chart:
             st.plotly_chart(fat_chart, use_container_width=True)
         else:
             st.info("📊 Fat percentage chart will appear here once you enter body metrics")
     
     # Body measurements chart
-    measurements_chart = analytics.create_body_measurements_chart()
+    measurements_chart = analytics.create_body_measurements_chart(viewport_width, chart_start, chart_end)
     if measurements_chart:
         st.plotly_chart(measurements_chart, use_container_width=True)
     
@@ -210,7 +225,7 @@ def main():
                 selected_week = st.selectbox("Select Week", sorted(weeks, reverse=True))
                 
                 # Get weekly summary
-                weekly_summary = data_manager.get_weekly_summary(selected_week)
+                weekly_summary = build_weekly_summary(selected_week, body_metrics, workout_data, diet_data)
                 
                 col1, col2, col3 = st.columns(3)
                 
@@ -330,44 +345,28 @@ def main():
             
             # Compliance trends
             if not workout_data.empty and not diet_data.empty:
-                # Get weekly compliance data
-                weeks = sorted(set(workout_data['week'].unique()) & set(diet_data['week'].unique()))
+                # Compliance of the last two weeks with both workout and diet entries
+                compliance = snapshot.compliance
+                weeks = compliance[(compliance['workout_entries'] > 0) & (compliance['diet_entries'] > 0)]
                 
                 if len(weeks) >= 2:
-                    recent_weeks = weeks[-2:]
-                    
-                    workout_trend = []
-                    diet_trend = []
-                    
-                    for week in recent_weeks:
-                        week_workouts = workout_data[workout_data['week'] == week]
-                        week_diet = diet_data[diet_data['week'] == week]
-                        
-                        if not week_workouts.empty:
-                            workout_compliance = (week_workouts['completed'].sum() / len(week_workouts)) * 100
-                            workout_trend.append(workout_compliance)
-                        
-                        if not week_diet.empty:
-                            diet_compliance = (week_diet['adherence_score'].mean() / 5) * 100
-                            diet_trend.append(diet_compliance)
+                    recent_weeks = weeks.tail(2)
                     
-                    if len(workout_trend) >= 2:
-                        workout_change = workout_trend[-1] - workout_trend[-2]
-                        workout_trend_dir = "📈 Improving" if workout_change > 0 else "📉 Declining"
-                        st.metric(
-                            "Workout Compliance Trend",
-                            workout_trend_dir,
-                            delta=f"{workout_change:+.0f}% vs last week"
-                        )
+                    workout_change = recent_weeks['workout_compliance'].iloc[-1] - recent_weeks['workout_compliance'].iloc[-2]
+                    workout_trend_dir = "📈 Improving" if workout_change > 0 else "📉 Declining"
+                    st.metric(
+                        "Workout Compliance Trend",
+                        workout_trend_dir,
+                        delta=f"{workout_change:+.0f}% vs last week"
+                    )
                     
-                    if len(diet_trend) >= 2:
-                        diet_change = diet_trend[-1] - diet_trend[-2]
-                        diet_trend_dir = "📈 Improving" if diet_change > 0 else "📉 Declining"
-                        st.metric(
-                            "Diet Compliance Trend",
-                            diet_trend_dir,
-                            delta=f"{diet_change:+.0f}% vs last week"
-                        )
+                    diet_change = recent_weeks['diet_compliance'].iloc[-1] - recent_weeks['diet_compliance'].iloc[-2]
+                    diet_trend_dir = "📈 Improving" if diet_change > 0 else "📉 Declining"
+                    st.metric(
+                        "Diet Compliance Trend",
+                        diet_trend_dir,
+                        delta=f"{diet_change:+.0f}% vs last week"
+                    )
         else:
             st.info("Need more data points to show trends. Keep tracking!")
     
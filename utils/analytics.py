@@ -1,28 +1,229 @@
+import hashlib
+import threading
+from collections import OrderedDict
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime, timedelta
+from utils.data_manager import weekly_compliance, filter_frame
+
+# Built figures kept per server process, shared by every session and rerun
+FIGURE_CACHE_ENTRIES = 64
+FIGURE_CACHE_BYTES = 32 * 1024 * 1024
+
+class FigureCache:
+    """
+    Built figures keyed by (chart id, data revision, parameters), evicting
+    the least recently used once either the entry or the size limit is reached
+    """
+    
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        """(True, figure) for a cached key, else (False, None)"""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, self.entries[key][0]
+    
+    def put(self, key, figure, size_bytes):
+        """Store a figure, evicting old ones to stay within the limits"""
+        with self.lock:
+            if key in self.entries:
+                self.size_bytes -= self.entries.pop(key)[1]
+            if size_bytes > self.max_bytes:
+                return
+            self.entries[key] = (figure, size_bytes)
+            self.size_bytes += size_bytes
+            while len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.size_bytes -= evicted_bytes
+    
+    def clear(self):
+        """Drop every cached figure"""
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+figure_cache = FigureCache()
+
+def _figure_bytes(fig):
+    """Rough size of a figure's data arrays, for the cache's size limit"""
+    size_bytes = 0
+    for trace in fig.data:
+        for prop in ('x', 'y', 'z', 'text', 'customdata'):
+            values = getattr(trace, prop, None)
+            if values is not None and not isinstance(values, str):
+                size_bytes += np.asarray(values).nbytes
+    return size_bytes
+
+# Line charts get about one point per pixel of screen width, but never fewer than this
+MIN_CHART_POINTS = 200
+
+def point_budget(viewport_width):
+    """Most points worth drawing in a line chart on a screen this wide; None means no limit"""
+    if viewport_width is None:
+        return None
+    return max(MIN_CHART_POINTS, int(viewport_width))
+
+# Charts drawing more points than this use WebGL traces, without client-side spline smoothing
+WEBGL_POINT_THRESHOLD = 1000
+
+def _scatter_type(points):
+    """Trace class for a chart drawing this many points: SVG for small ones, WebGL for large ones"""
+    return go.Scattergl if points > WEBGL_POINT_THRESHOLD else go.Scatter
+
+def lttb(x, y, threshold):
+    """
+    Positions of the points Largest-Triangle-Three-Buckets keeps to draw a
+    series with `threshold` points; all of them if it has no more than that
+    """
+    n = len(x)
+    if threshold is None or threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # The first and last points are always kept; the rest are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket; the last bucket looks at the final point
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Keep the point forming the largest triangle with the last kept point and that average
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+    
+    return kept
+
+def _series(df, column, start=None, end=None):
+    """Dated rows of one column that have a value, optionally limited to a date range"""
+    df = filter_frame(df, start, end)
+    return df[df['date'].notna() & df[column].notna()].reset_index(drop=True)
+
+def _downsample(series, column, max_points):
+    """Positions of the rows to draw for one column, reduced with LTTB to at most max_points"""
+    return lttb(series['date'].to_numpy('datetime64[ns]').astype(np.int64), series[column].to_numpy(np.float64), max_points)
+
+def _revision(*frames):
+    """Content hash of some frames, so figures built from equal data are reused"""
+    digest = hashlib.sha1()
+    for df in frames:
+        digest.update(repr(list(df.columns)).encode('utf-8'))
+        if not df.empty:
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _by_date(df):
+    """Frame in date order, keeping entry order for equal dates"""
+    if df.empty or 'date' not in df.columns:
+        return df
+    return df.sort_values('date', kind='stable', ignore_index=True)
+
+class AnalyticsSnapshot:
+    """
+    The data one render of the analytics page works from: every table sorted
+    by date, plus the derived columns and weekly compliance the charts share.
+    Built once per rerun; chart builders read it and never modify it.
+    """
+    
+    def __init__(self, body_metrics, workout_data, diet_data):
+        self.body_metrics = _by_date(body_metrics)
+        self.workout_data = _by_date(workout_data)
+        self.diet_data = _by_date(diet_data)
+        
+        if not self.workout_data.empty:
+            self.workout_data = self.workout_data.assign(
+                day_of_week=self.workout_data['date'].dt.day_name(),
+                week_start=self.workout_data['date'].dt.to_period('W').dt.start_time
+            )
+        self.compliance = weekly_compliance(self.workout_data, self.diet_data)
+        self.revision = _revision(self.body_metrics, self.workout_data, self.diet_data)
 
 class Analytics:
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, snapshot=None):
         self.data_manager = data_manager
+        self.snapshot = snapshot
+    
+    def use_data(self, body_metrics, workout_data, diet_data):
+        """Work from frames the page already loaded for this render"""
+        self.snapshot = AnalyticsSnapshot(body_metrics, workout_data, diet_data)
+        return self.snapshot
+    
+    def _data(self):
+        """This render's snapshot, loaded once if the page didn't hand one in"""
+        if self.snapshot is None:
+            self.use_data(*self.data_manager.load_all())
+        return self.snapshot
+    
+    def _figure(self, chart_id, build, **params):
+        """
+        A chart, built only when the data or parameters changed since it was
+        last built. The figure is shared: don't modify it.
+        """
+        key = (chart_id, self._data().revision, tuple(sorted(params.items())))
+        found, figure = figure_cache.get(key)
+        if found:
+            return figure
+        
+        fig = build(**params)
+        if fig is None:
+            figure_cache.put(key, None, 0)
+            return None
+        
+        # Keep the Figure itself: st.plotly_chart validates a dict from scratch on every call
+        figure_cache.put(key, fig, _figure_bytes(fig))
+        return fig
     
-    def create_weight_progress_chart(self):
-        """Create weight progress line chart"""
-        body_metrics = self.data_manager.load_body_metrics()
+    def create_weight_progress_chart(self, viewport_width=None, start=None, end=None):
+        """
+        Create weight progress line chart; long histories are downsampled to suit viewport_width
+        unless a date range narrow enough for full resolution is given
+        """
+        return self._figure('weight_progress', self._build_weight_progress, viewport_width=viewport_width, start=start, end=end)
+    
+    def _build_weight_progress(self, viewport_width=None, start=None, end=None):
+        """Build the weight progress figure"""
+        body_metrics = self._data().body_metrics
         
         if body_metrics.empty:
             return None
         
+        series = _series(body_metrics, 'weight', start, end)
+        kept = _downsample(series, 'weight', point_budget(viewport_width))
+        webgl = len(kept) > WEBGL_POINT_THRESHOLD
+        
         fig = px.line(
-            body_metrics, 
+            series.iloc[kept], 
             x='date', 
             y='weight',
             title='Weight Progress Over Time',
             markers=True,
-            line_shape='spline'
+            line_shape='linear' if webgl else 'spline',
+            render_mode='webgl' if webgl else 'svg'
         )
         
         fig.update_layout(
@@ -31,14 +232,14 @@ class Analytics:
             hovermode='x unified'
         )
         
-        # Add trend line
-        if len(body_metrics) > 1:
-            z = np.polyfit(range(len(body_metrics)), body_metrics['weight'], 1)
+        # Add trend line, fitted to every point but drawn through the ones shown
+        if len(series) > 1:
+            z = np.polyfit(range(len(series)), series['weight'], 1)
             trend_line = np.poly1d(z)
             fig.add_trace(
-                go.Scatter(
-                    x=body_metrics['date'],
-                    y=trend_line(range(len(body_metrics))),
+                _scatter_type(len(kept))(
+                    x=series['date'].iloc[kept],
+                    y=trend_line(kept),
                     mode='lines',
                     name='Trend',
                     line=dict(dash='dash', color='red', width=2)
@@ -47,20 +248,32 @@ class Analytics:
         
         return fig
     
-    def create_fat_percentage_chart(self):
-        """Create fat percentage progress chart"""
-        body_metrics = self.data_manager.load_body_metrics()
+    def create_fat_percentage_chart(self, viewport_width=None, start=None, end=None):
+        """
+        Create fat percentage progress chart; long histories are downsampled to suit viewport_width
+        unless a date range narrow enough for full resolution is given
+        """
+        return self._figure('fat_percentage', self._build_fat_percentage, viewport_width=viewport_width, start=start, end=end)
+    
+    def _build_fat_percentage(self, viewport_width=None, start=None, end=None):
+        """Build the fat percentage figure"""
+        body_metrics = self._data().body_metrics
         
         if body_metrics.empty:
             return None
         
+        series = _series(body_metrics, 'fat_percentage', start, end)
+        kept = _downsample(series, 'fat_percentage', point_budget(viewport_width))
+        webgl = len(kept) > WEBGL_POINT_THRESHOLD
+        
         fig = px.line(
-            body_metrics, 
+            series.iloc[kept], 
             x='date', 
             y='fat_percentage',
             title='Fat Percentage Progress Over Time',
             markers=True,
-            line_shape='spline',
+            line_shape='linear' if webgl else 'spline',
+            render_mode='webgl' if webgl else 'svg',
             color_discrete_sequence=['#FF6B6B']
         )
         
@@ -70,14 +283,14 @@ class Analytics:
             hovermode='x unified'
         )
         
-        # Add trend line
-        if len(body_metrics) > 1:
-            z = np.polyfit(range(len(body_metrics)), body_metrics['fat_percentage'], 1)
+        # Add trend line, fitted to every point but drawn through the ones shown
+        if len(series) > 1:
+            z = np.polyfit(range(len(series)), series['fat_percentage'], 1)
             trend_line = np.poly1d(z)
             fig.add_trace(
-                go.Scatter(
-                    x=body_metrics['date'],
-                    y=trend_line(range(len(body_metrics))),
+                _scatter_type(len(kept))(
+                    x=series['date'].iloc[kept],
+                    y=trend_line(kept),
                     mode='lines',
                     name='Trend',
                     line=dict(dash='dash', color='darkred', width=2)
@@ -86,15 +299,19 @@ class Analytics:
         
         return fig
     
-    def create_body_measurements_chart(self):
-        """Create body measurements chart"""
-        body_metrics = self.data_manager.load_body_metrics()
+    def create_body_measurements_chart(self, viewport_width=None, start=None, end=None):
+        """Create body measurements chart, downsampled like the weight chart"""
+        return self._figure('body_measurements', self._build_body_measurements, viewport_width=viewport_width, start=start, end=end)
+    
+    def _build_body_measurements(self, viewport_width=None, start=None, end=None):
+        """Build the body measurements figure"""
+        measurement_cols = ['chest', 'waist', 'hips', 'arms', 'thighs']
+        body_metrics = self._data().body_metrics
         
         if body_metrics.empty:
             return None
         
         # Select measurement columns that have data
-        measurement_cols = ['chest', 'waist', 'hips', 'arms', 'thighs']
         available_cols = [col for col in measurement_cols if col in body_metrics.columns and body_metrics[col].notna().any()]
         
         if not available_cols:
@@ -104,11 +321,18 @@ class Analytics:
         
         colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
         
+        shown = {}
+        for col in available_cols:
+            series = _series(body_metrics, col, start, end)
+            shown[col] = series.iloc[_downsample(series, col, point_budget(viewport_width))]
+        # Overlaid measurements count together towards the WebGL threshold
+        scatter = _scatter_type(sum(len(points) for points in shown.values()))
+        
         for i, col in enumerate(available_cols):
             fig.add_trace(
-                go.Scatter(
-                    x=body_metrics['date'],
-                    y=body_metrics[col],
+                scatter(
+                    x=shown[col]['date'],
+                    y=shown[col][col],
                     mode='lines+markers',
                     name=col.title(),
                     line=dict(color=colors[i % len(colors)], width=2),
@@ -128,51 +352,22 @@ class Analytics:
     
     def create_compliance_chart(self):
         """Create weekly compliance chart"""
-        workout_data = self.data_manager.load_workout_data()
-        diet_data = self.data_manager.load_diet_data()
-        
-        if workout_data.empty and diet_data.empty:
-            return None
-        
-        # Calculate weekly compliance
-        compliance_data = []
-        
-        # Get all weeks from both datasets
-        weeks = set()
-        if not workout_data.empty:
-            weeks.update(workout_data['week'].unique())
-        if not diet_data.empty:
-            weeks.update(diet_data['week'].unique())
-        
-        for week in sorted(weeks):
-            week_data = {'week': week}
-            
-            # Workout compliance
-            week_workouts = workout_data[workout_data['week'] == week] if not workout_data.empty else pd.DataFrame()
-            if not week_workouts.empty:
-                week_data['workout_compliance'] = (week_workouts['completed'].sum() / len(week_workouts)) * 100
-            else:
-                week_data['workout_compliance'] = 0
-            
-            # Diet compliance
-            week_diet = diet_data[diet_data['week'] == week] if not diet_data.empty else pd.DataFrame()
-            if not week_diet.empty:
-                week_data['diet_compliance'] = (week_diet['adherence_score'].mean() / 5) * 100
-            else:
-                week_data['diet_compliance'] = 0
-            
-            compliance_data.append(week_data)
+        return self._figure('compliance', self._build_compliance)
+    
+    def _build_compliance(self):
+        """Build the compliance figure"""
+        # Weekly compliance of every week, computed once per snapshot
+        compliance_df = self._data().compliance
         
-        if not compliance_data:
+        if compliance_df.empty:
             return None
         
-        compliance_df = pd.DataFrame(compliance_data)
-        
+        scatter = _scatter_type(2 * len(compliance_df))
         fig = go.Figure()
         
         fig.add_trace(
-            go.Scatter(
-                x=compliance_df['week'],
+            scatter(
+                x=compliance_df.index,
                 y=compliance_df['workout_compliance'],
                 mode='lines+markers',
                 name='Workout Compliance',
@@ -182,8 +377,8 @@ class Analytics:
         )
         
         fig.add_trace(
-            go.Scatter(
-                x=compliance_df['week'],
+            scatter(
+                x=compliance_df.index,
                 y=compliance_df['diet_compliance'],
                 mode='lines+markers',
                 name='Diet Compliance',
@@ -208,15 +403,16 @@ class Analytics:
     
     def create_workout_heatmap(self):
         """Create workout completion heatmap"""
-        workout_data = self.data_manager.load_workout_data()
+        return self._figure('workout_heatmap', self._build_workout_heatmap)
+    
+    def _build_workout_heatmap(self):
+        """Build the workout heatmap figure"""
+        workout_data = self._data().workout_data
         
         if workout_data.empty:
             return None
         
-        # Create a pivot table for the heatmap
-        workout_data['day_of_week'] = workout_data['date'].dt.day_name()
-        workout_data['week_start'] = workout_data['date'].dt.to_period('W').dt.start_time
-        
+        # Create a pivot table for the heatmap from the snapshot's day_of_week and week_start
         pivot_data = workout_data.pivot_table(
             values='completed',
             index='week_start',
@@ -245,9 +441,10 @@ class Analytics:
     
     def get_progress_stats(self):
         """Calculate various progress statistics"""
-        body_metrics = self.data_manager.load_body_metrics()
-        workout_data = self.data_manager.load_workout_data()
-        diet_data = self.data_manager.load_diet_data()
+        data = self._data()
+        body_metrics = data.body_metrics
+        workout_data = data.workout_data
+        diet_data = data.diet_data
         
         stats = {}
         
@@ -282,11 +479,17 @@ class Analytics:
     
     def create_summary_dashboard(self):
         """Create a comprehensive summary dashboard"""
-        body_metrics = self.data_manager.load_body_metrics()
+        return self._figure('summary_dashboard', self._build_summary_dashboard)
+    
+    def _build_summary_dashboard(self):
+        """Build the summary dashboard figure"""
+        body_metrics = self._data().body_metrics
         
         if body_metrics.empty:
             return None
         
+        scatter = _scatter_type(len(body_metrics))
+        
         # Create subplots
         fig = make_subplots(
             rows=2, cols=2,
@@ -297,25 +500,25 @@ class Analytics:
         
         # Weight progress
         fig.add_trace(
-            go.Scatter(x=body_metrics['date'], y=body_metrics['weight'],
+            scatter(x=body_metrics['date'], y=body_metrics['weight'],
                       mode='lines+markers', name='Weight', line=dict(color='#4ECDC4')),
             row=1, col=1
         )
         
         # Fat percentage
         fig.add_trace(
-            go.Scatter(x=body_metrics['date'], y=body_metrics['fat_percentage'],
+            scatter(x=body_metrics['date'], y=body_metrics['fat_percentage'],
                       mode='lines+markers', name='Fat %', line=dict(color='#FF6B6B')),
             row=1, col=2
         )
         
         # Weekly weight change
         if len(body_metrics) > 1:
-            body_metrics_sorted = body_metrics.sort_values('date')
-            body_metrics_sorted['weight_change'] = body_metrics_sorted['weight'].diff()
+            # The snapshot is already in date order
+            weight_change = body_metrics['weight'].diff()
             
             fig.add_trace(
-                go.Bar(x=body_metrics_sorted['date'], y=body_metrics_sorted['weight_change'],
+                go.Bar(x=body_metrics['date'], y=weight_change,
                       name='Weekly Change', marker_color='#96CEB4'),
                 row=2, col=1
             )
@@ -325,7 +528,7 @@ class Analytics:
         for i, col in enumerate(measurement_cols):
             if col in body_metrics.columns and body_metrics[col].notna().any():
                 fig.add_trace(
-                    go.Scatter(x=body_metrics['date'], y=body_metrics[col],
+                    scatter(x=body_metrics['date'], y=body_metrics[col],
                               mode='lines+markers', name=col.title()),
                     row=2, col=2
                 )
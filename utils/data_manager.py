@@ -1,18 +1,228 @@
 import pandas as pd
+import numpy as np
+import io
+import json
 import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from utils.schemas import TABLE_COLUMNS, TABLE_KEYS, DATE_FORMAT, apply_schema, csv_dtypes, empty_frame
+
+try:
+    import pyarrow.parquet  # backs DataFrame.to_parquet and pd.read_parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialised within this process
+    fcntl = None
+
+# Parsed table files shared by every DataManager in the process, keyed by
+# (path, projected columns) and validated against the file's (mtime, size, inode)
+_frame_cache = {}
+_frame_cache_lock = threading.Lock()
+
+# Serialises writers inside this process; fcntl locks do the same across processes
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+
+@contextmanager
+def _exclusive_lock(lock_path):
+    """Hold an exclusive advisory lock for writing. Readers never take it."""
+    with _write_locks_guard:
+        thread_lock = _write_locks.setdefault(lock_path, threading.Lock())
+    
+    with thread_lock, open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _atomic_write(path, writer):
+    """
+    Call writer(temp_path) for a temporary file next to path, flush it to
+    disk and swap it into place, so readers see either the old or the new file
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f".{name}.", suffix='.tmp')
+    os.close(fd)
+    try:
+        writer(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _file_signature(path):
+    """Cheap fingerprint that changes whenever a file is rewritten or appended to"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+# pandas 3 always copies on write, so a shallow copy keeps a caller's edits
+# out of a cached frame; older pandas shares the arrays unless copied deeply
+_SHALLOW_COPIES_ISOLATE = int(pd.__version__.split('.')[0]) >= 3
+
+def _cache_copy(df):
+    """Copy of a cached frame that callers may modify without touching the cache"""
+    return df.copy(deep=not _SHALLOW_COPIES_ISOLATE)
+
+def _complete_length(path):
+    """Length of a file up to and including its last newline"""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
+def key_index(df, table):
+    """Index of each row's key (date, or date and day), in row order"""
+    keys = TABLE_KEYS[table]
+    dates = df['date'].dt.normalize()
+    if len(keys) == 1:
+        return pd.Index(dates, name='date')
+    # Plain objects so keys match whatever categories each frame happens to have
+    return pd.MultiIndex.from_arrays(
+        [dates] + [df[col].astype(object) for col in keys[1:]], names=keys
+    )
+
+def settle_frame(df, table):
+    """
+    Collapse rows sharing a key so the last write wins, keeping each entry
+    at the position of its first write. Returns the frame and its key index.
+    """
+    index = key_index(df, table)
+    duplicated = index.duplicated(keep='last')
+    if duplicated.any():
+        first_seen = index.unique().get_indexer(index[~duplicated])
+        order = np.argsort(first_seen, kind='stable')
+        df = df[~duplicated].iloc[order].reset_index(drop=True)
+        index = index[~duplicated][order]
+    return df, index
+
+def merge_frames(df, updates, table, index=None):
+    """
+    Upsert typed rows into a settled frame in one vectorised pass.
+    Rows whose key already exists replace it in place, the rest are added
+    at the end, and within updates the last row for a key wins. Returns
+    the merged frame and its key index so callers can keep both.
+    """
+    updates, update_index = settle_frame(updates, table)
+    
+    if df.empty:
+        return updates.reset_index(drop=True), update_index
+    
+    index = index if index is not None else key_index(df, table)
+    positions = index.get_indexer(update_index)
+    existing = positions >= 0
+    
+    # Take every row of df, swapping replaced rows for their update, then the new keys
+    take = np.arange(len(df))
+    take[positions[existing]] = len(df) + np.flatnonzero(existing)
+    take = np.concatenate([take, len(df) + np.flatnonzero(~existing)])
+    
+    combined = pd.concat([df, updates], ignore_index=True)
+    merged = apply_schema(combined.iloc[take].reset_index(drop=True), table)
+    return merged, index.append(update_index[~existing])
+
+def filter_frame(df, start=None, end=None, columns=None):
+    """Apply an inclusive date range and column selection to an already loaded frame"""
+    if not df.empty and 'date' in df.columns and (start is not None or end is not None):
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df['date'] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= df['date'] <= pd.Timestamp(end)
+        df = df[mask].reset_index(drop=True)
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return df
+
+def weekly_compliance(workout_data, diet_data):
+    """
+    Workout and diet compliance (%) of every week, with one groupby per table.
+    Indexed by week in order; weeks missing from a table count 0 entries and 0%.
+    """
+    columns = {}
+    if not workout_data.empty:
+        # Share of planned workouts completed
+        grouped = workout_data['completed'].astype(float).groupby(workout_data['week'], observed=True)
+        columns['workout_entries'] = grouped.size()
+        columns['workout_compliance'] = grouped.mean() * 100
+    if not diet_data.empty:
+        # Average adherence on the 1-5 scale, as a percentage
+        grouped = diet_data['adherence_score'].astype(float).groupby(diet_data['week'], observed=True)
+        columns['diet_entries'] = grouped.size()
+        columns['diet_compliance'] = grouped.mean() / 5 * 100
+    
+    for values in columns.values():
+        # Both tables' week categories differ, so align on plain week labels
+        values.index = values.index.astype(object)
+    compliance = pd.DataFrame(
+        columns,
+        columns=['workout_entries', 'workout_compliance', 'diet_entries', 'diet_compliance']
+    ).fillna(0).sort_index()
+    compliance = compliance.astype({
+        'workout_entries': int,
+        'workout_compliance': float,
+        'diet_entries': int,
+        'diet_compliance': float
+    })
+    compliance.index.name = 'week'
+    return compliance
+
+def build_weekly_summary(week, body_metrics, workout_data, diet_data):
+    """Build the weekly summary dict from already loaded frames"""
+    summary = {
+        'week': week,
+        'body_metrics': body_metrics[body_metrics['week'] == week] if not body_metrics.empty else pd.DataFrame(),
+        'workout_data': workout_data[workout_data['week'] == week] if not workout_data.empty else pd.DataFrame(),
+        'diet_data': diet_data[diet_data['week'] == week] if not diet_data.empty else pd.DataFrame()
+    }
+    
+    # Calculate compliance scores
+    compliance = weekly_compliance(summary['workout_data'], summary['diet_data']).reindex([week], fill_value=0)
+    summary['workout_compliance'] = float(compliance['workout_compliance'].iloc[0])
+    summary['diet_compliance'] = float(compliance['diet_compliance'].iloc[0])
+    
+    return summary
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, storage_format="csv"):
+        if storage_format not in ("csv", "parquet"):
+            raise ValueError(f"Unknown storage format: {storage_format}")
+        if storage_format == "parquet" and not PARQUET_AVAILABLE:
+            raise ImportError("The parquet storage format requires pyarrow")
+        
         self.data_dir = "data"
+        self.storage_format = storage_format
         self.ensure_data_directory()
         
-        # File paths
+        # Single-file layout used before tables were split into monthly shards
         self.body_metrics_file = os.path.join(self.data_dir, "body_metrics.csv")
         self.workout_data_file = os.path.join(self.data_dir, "workout_data.csv")
         self.diet_data_file = os.path.join(self.data_dir, "diet_data.csv")
         
-        # Initialize files if they don't exist
+        # Create the shard directories, moving data over from older layouts
         self.initialize_files()
     
     def ensure_data_directory(self):
@@ -21,71 +231,483 @@ class DataManager:
             os.makedirs(self.data_dir)
     
     def initialize_files(self):
-        """Initialize CSV files with headers if they don't exist"""
+        """Create each table's shard directory, importing older layouts on first use"""
+        for table, legacy_path in self._table_files().items():
+            os.makedirs(self._partition_dir(table), exist_ok=True)
+            if os.path.exists(legacy_path):
+                with self._table_lock(table):
+                    if os.path.exists(legacy_path):
+                        self._migrate_legacy_file(table, legacy_path)
+            
+            if not self._formats_in_sync(table):
+                with self._table_lock(table):
+                    if not self._formats_in_sync(table):
+                        self._reconcile_formats(table)
+    
+    def _migrate_legacy_file(self, table, legacy_path):
+        """
+        Split a single-file table into monthly CSV shards. Safe to re-run after
+        a crash: rows already in a shard win over the legacy file's.
+        """
+        legacy = self._read_csv(legacy_path, table, None)
+        if not legacy.empty:
+            for month, month_data in legacy.groupby(legacy['date'].dt.strftime('%Y-%m'), sort=True):
+                path = self._partition_path(table, month, "csv")
+                if os.path.exists(path):
+                    month_data = merge_frames(month_data, self._read_csv(path, table, None), table)[0]
+                self._write_csv_shard(path, month_data)
+        
+        # Keep the old file around as a backup rather than deleting data
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+    
+    def _other_format(self):
+        """The storage format this manager doesn't use"""
+        return "parquet" if self.storage_format == "csv" else "csv"
+    
+    def _sync_path(self, table):
+        """Sidecar recording both formats' shards as of the last time they held the same data"""
+        return os.path.join(self.data_dir, f"{table}.sync.json")
+    
+    def _read_sync(self, table):
+        """Shard signature per storage format at the last sync; a format missing from it changed since"""
+        try:
+            with open(self._sync_path(table)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _formats_in_sync(self, table):
+        """Whether the other format's shards hold nothing this format lacks"""
+        other_signature = self._data_signature(table, self._other_format())
+        # Writes in this format since the last sync are fine: the other one catches up when it is used
+        return not other_signature or self._read_sync(table).get(self._other_format()) == other_signature
+    
+    def _reconcile_formats(self, table):
+        """
+        Bring this format's shards up to date after the other format was written
+        to, e.g. after switching CSV -> Parquet -> CSV. Call with the table lock
+        held. Refuses to go on when both formats changed since they last matched.
+        """
+        other = self._other_format()
+        if other == "parquet" and not PARQUET_AVAILABLE:
+            print(f"Not checking the Parquet copy of {table} against the CSV one: pyarrow is not installed")
+            return
         
-        # Body metrics file
-        if not os.path.exists(self.body_metrics_file):
-            body_metrics_df = pd.DataFrame(columns=[
-                'date', 'week', 'weight', 'fat_percentage', 'muscle_mass',
-                'chest', 'waist', 'hips', 'arms', 'thighs', 'notes'
-            ])
-            body_metrics_df.to_csv(self.body_metrics_file, index=False)
+        own_signature = self._data_signature(table)
+        other_signature = self._data_signature(table, other)
+        synced = self._read_sync(table)
         
-        # Workout data file
-        if not os.path.exists(self.workout_data_file):
-            workout_df = pd.DataFrame(columns=[
-                'date', 'week', 'day', 'workout_type', 'completed',
-                'exercises_completed', 'total_exercises', 'duration_minutes',
-                'intensity_rating', 'notes'
-            ])
-            workout_df.to_csv(self.workout_data_file, index=False)
+        if not own_signature or synced.get(self.storage_format) == own_signature:
+            # Only the other format changed since the last sync
+            self._import_shards(table, other)
+            synced = None
+        elif not synced and max(entry[1] for entry in other_signature) <= min(entry[1] for entry in own_signature):
+            # No record yet (a store converted before syncs were recorded), but
+            # the other format is untouched since every shard here was written
+            synced = {other: other_signature}
+        elif not self._formats_match(table, other):
+            raise ValueError(
+                f"The CSV and Parquet copies of {table} in {os.path.abspath(self._partition_dir(table))} "
+                f"both changed since they last matched. Move the shards of the copy to discard out of "
+                f"that directory and restart."
+            )
+        else:
+            synced = None
+        
+        if synced is None:
+            synced = {
+                storage_format: self._data_signature(table, storage_format)
+                for storage_format in ("csv", "parquet")
+            }
+        _atomic_write(self._sync_path(table), lambda tmp_path: self._dump_manifest(tmp_path, synced))
+    
+    def _read_format(self, table, storage_format):
+        """Every settled row of a table as stored in one format, in key order"""
+        frames = [
+            self._read_shard(path, table, None, storage_format)
+            for path in self._partition_files(table, extension=storage_format)
+        ]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return empty_frame(table)
+        df = apply_schema(pd.concat(frames, ignore_index=True), table)
+        return df.sort_values(list(TABLE_KEYS[table]), ignore_index=True)
+    
+    def _formats_match(self, table, other):
+        """Whether both formats' shards hold the same rows"""
+        own = self._read_format(table, self.storage_format).to_csv(index=False, date_format=DATE_FORMAT)
+        return own == self._read_format(table, other).to_csv(index=False, date_format=DATE_FORMAT)
+    
+    def _import_shards(self, table, source_format):
+        """Replace a table's shards with converted copies of its shards in another format"""
+        source_paths = self._partition_files(table, extension=source_format)
         
-        # Diet data file
-        if not os.path.exists(self.diet_data_file):
-            diet_df = pd.DataFrame(columns=[
-                'date', 'week', 'day', 'adherence_score', 'calories_estimated',
-                'meals_followed', 'total_planned_meals', 'notes'
-            ])
-            diet_df.to_csv(self.diet_data_file, index=False)
-    
-    def load_body_metrics(self):
-        """Load body metrics data"""
+        # Stage every partition first so a failure can't leave a half-imported table
+        staging_dir = tempfile.mkdtemp(dir=self.data_dir, prefix=f".{table}.")
         try:
-            df = pd.read_csv(self.body_metrics_file)
-            if not df.empty:
-                df['date'] = pd.to_datetime(df['date'])
+            for path in source_paths:
+                month = os.path.basename(path)[:-len(source_format) - 1]
+                df = self._read_shard(path, table, None, source_format)
+                staged_path = os.path.join(staging_dir, f"{month}.{self.storage_format}")
+                if self.storage_format == "parquet":
+                    df.to_parquet(staged_path, index=False)
+                else:
+                    df.to_csv(staged_path, index=False, date_format=DATE_FORMAT)
+            imported = sorted(os.listdir(staging_dir))
+            for name in imported:
+                os.chmod(os.path.join(staging_dir, name), 0o644)
+                os.replace(os.path.join(staging_dir, name), os.path.join(self._partition_dir(table), name))
+            # Months the source doesn't have any more
+            for path in self._partition_files(table):
+                if os.path.basename(path) not in imported:
+                    os.remove(path)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    def _partition_dir(self, table):
+        """Directory holding a table's monthly shards"""
+        return os.path.join(self.data_dir, table)
+    
+    def _partition_path(self, table, month, extension=None):
+        """Shard file for one month ("YYYY-MM") of a table"""
+        return os.path.join(self._partition_dir(table), f"{month}.{extension or self.storage_format}")
+    
+    def _partition_files(self, table, start=None, end=None, extension=None):
+        """List shard files in month order, skipping months outside the date range"""
+        suffix = f".{extension or self.storage_format}"
+        partition_dir = self._partition_dir(table)
+        if not os.path.isdir(partition_dir):
+            return []
+        
+        first_month = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        last_month = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+        
+        files = []
+        for name in sorted(os.listdir(partition_dir)):
+            if not name.endswith(suffix) or name.startswith('.'):
+                continue
+            month = name[:-len(suffix)]
+            if (first_month and month < first_month) or (last_month and month > last_month):
+                continue
+            files.append(os.path.join(partition_dir, name))
+        return files
+    
+    def _write_partition(self, path, df):
+        """Write a partition to a temporary file and swap it into place"""
+        _atomic_write(path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+    
+    def _write_csv_shard(self, path, df):
+        """Atomically replace a CSV shard with the given rows"""
+        _atomic_write(path, lambda tmp_path: df.to_csv(tmp_path, index=False, date_format=DATE_FORMAT))
+    
+    def _write_bytes(self, path, data):
+        """Write raw bytes to a file"""
+        with open(path, 'wb') as f:
+            f.write(data)
+    
+    def _table_lock(self, table):
+        """Exclusive lock held by anything writing a table's files"""
+        return _exclusive_lock(os.path.join(self.data_dir, f".{table}.lock"))
+    
+    def _manifest_path(self, table):
+        """Sidecar file summarising a table in the configured storage format"""
+        return os.path.join(self.data_dir, f"{table}.{self.storage_format}.manifest.json")
+    
+    def _data_signature(self, table, extension=None):
+        """Fingerprint of every shard of a table, as stored in its manifest"""
+        signature = []
+        for path in self._partition_files(table, extension=extension):
+            file_signature = _file_signature(path)
+            if file_signature is not None:
+                signature.append([os.path.basename(path), *file_signature])
+        return signature
+    
+    def get_table_manifest(self, table):
+        """
+        Row count, date range, last-modified time and size of a table, kept
+        up to date by the write path. Rebuilt from the data only
+        when the files changed behind its back.
+        """
+        signature = self._data_signature(table)
+        try:
+            with open(self._manifest_path(table)) as f:
+                manifest = json.load(f)
+            if manifest['signature'] == signature:
+                return manifest
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return self._rebuild_manifest(table)
+    
+    def _rebuild_manifest(self, table):
+        """Recompute a table's manifest from its files"""
+        signature = self._data_signature(table)
+        dates = self._load_table(table, columns=['date'])['date']
+        
+        manifest = {
+            'row_count': len(dates),
+            'min_date': None,
+            'max_date': None,
+            'size_bytes': sum(entry[2] for entry in signature)
+        }
+        self._note_dates(manifest, dates)
+        self._write_manifest(table, manifest, signature)
+        return manifest
+    
+    def _note_dates(self, manifest, dates):
+        """Widen a manifest's date range to cover some dates"""
+        dates = dates.dropna()
+        if dates.empty:
+            return
+        
+        low, high = dates.min().strftime(DATE_FORMAT), dates.max().strftime(DATE_FORMAT)
+        manifest['min_date'] = min(manifest['min_date'] or low, low)
+        manifest['max_date'] = max(manifest['max_date'] or high, high)
+    
+    def _write_manifest(self, table, manifest, signature):
+        """Stamp a manifest with the data signature it describes and store it"""
+        manifest['signature'] = signature
+        # Older manifests carried a content hash that nothing read
+        manifest.pop('content_hash', None)
+        manifest['last_modified'] = (
+            datetime.fromtimestamp(max(entry[1] for entry in signature) / 1e9).isoformat(timespec='seconds')
+            if signature else None
+        )
+        _atomic_write(self._manifest_path(table), lambda tmp_path: self._dump_manifest(tmp_path, manifest))
+    
+    def _dump_manifest(self, path, manifest):
+        """Write a manifest as JSON"""
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    
+    def _table_files(self):
+        """Map each table name to its file in the old single-file layout"""
+        return {
+            'body_metrics': self.body_metrics_file,
+            'workout_data': self.workout_data_file,
+            'diet_data': self.diet_data_file
+        }
+    
+    def _settle(self, df, table):
+        """Collapse superseded rows so the last write for each key wins"""
+        if df.empty:
             return df
+        return settle_frame(df, table)[0]
+    
+    def _read_columns(self, table, columns):
+        """Columns to read for a projection; key columns are always needed to settle rows"""
+        if columns is None:
+            return None
+        wanted = set(columns) | set(TABLE_KEYS[table])
+        return [col for col in TABLE_COLUMNS[table] if col in wanted]
+    
+    def _cached_frame(self, path, read_columns, reader):
+        """
+        Return a parsed file from the process-wide cache, calling reader only
+        when the file changed. Frames are shared between sessions, so callers
+        get a copy.
+        """
+        key = (path, tuple(read_columns) if read_columns is not None else None)
+        signature = _file_signature(path)
+        with _frame_cache_lock:
+            entry = _frame_cache.get(key)
+            full_entry = _frame_cache.get((path, None))
+        
+        if entry is not None and entry[0] == signature:
+            return _cache_copy(entry[1])
+        if read_columns is not None and full_entry is not None and full_entry[0] == signature:
+            return full_entry[1][list(read_columns)]
+        
+        df = reader()
+        with _frame_cache_lock:
+            # [signature, frame, key index built on first use]
+            _frame_cache[key] = [signature, df, None]
+        return _cache_copy(df)
+    
+    def _cached_table(self, path, table, reader):
+        """Full cached frame of a file together with its (date, day) key index"""
+        self._cached_frame(path, None, reader)
+        with _frame_cache_lock:
+            entry = _frame_cache[(path, None)]
+            if entry[2] is None:
+                entry[2] = key_index(entry[1], table) if not entry[1].empty else None
+            return entry[0], entry[1], entry[2]
+    
+    def _store_cache(self, path, signature, df, index):
+        """Replace a file's cache entries with a frame the writer already holds"""
+        self._invalidate_cache(path)
+        with _frame_cache_lock:
+            _frame_cache[(path, None)] = [signature, df, index]
+    
+    def _invalidate_cache(self, path):
+        """Drop every cached projection of a file after writing it"""
+        with _frame_cache_lock:
+            for key in [key for key in _frame_cache if key[0] == path]:
+                del _frame_cache[key]
+    
+    def _read_csv(self, path, table, read_columns):
+        """Parse a CSV file and settle any superseded rows"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        # An append may be in flight; only parse complete lines so a reader
+        # never has to wait for the writer
+        df = pd.read_csv(
+            io.BytesIO(data[:data.rfind(b'\n') + 1]),
+            usecols=read_columns,
+            dtype=csv_dtypes(table, read_columns)
+        )
+        df = apply_schema(df, table)
+        return self._settle(df, table)
+    
+    def _read_shard(self, path, table, read_columns, storage_format=None):
+        """Parse one shard in the configured (or the given) storage format"""
+        if (storage_format or self.storage_format) == "parquet":
+            return pd.read_parquet(path, columns=read_columns)
+        return self._read_csv(path, table, read_columns)
+    
+    def _load_table(self, table, start=None, end=None, columns=None):
+        """Read only the shards and columns a query needs"""
+        read_columns = self._read_columns(table, columns)
+        
+        # Whole month shards are cached; the date range is applied in memory
+        frames = [
+            self._cached_frame(path, read_columns, lambda path=path: self._read_shard(path, table, read_columns))
+            for path in self._partition_files(table, start, end)
+        ]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return empty_frame(table, columns)
+        
+        # Categories differ between shards, so re-apply the schema after joining them
+        df = apply_schema(pd.concat(frames, ignore_index=True), table)
+        return filter_frame(df, start, end, columns)
+    
+    def _save_row(self, table, row):
+        """Record one entry in the configured storage format"""
+        self.merge_records(table, [row])
+    
+    def merge_records(self, table, records):
+        """
+        Upsert one or many records (dicts keyed by column name) in a single
+        pass; records for an existing key replace it, last record wins
+        """
+        updates = pd.DataFrame(list(records), columns=TABLE_COLUMNS[table])
+        if updates.empty:
+            return
+        
+        # Records may leave out the derived week column
+        missing_week = updates['week'].isna()
+        if missing_week.any():
+            derived = pd.to_datetime(updates['date']).dt.strftime("%Y-W%U")
+            updates['week'] = updates['week'].astype(object).where(~missing_week, derived)
+        updates = apply_schema(updates, table)
+        
+        with self._table_lock(table):
+            manifest = self.get_table_manifest(table)
+            months = updates['date'].dt.strftime('%Y-%m')
+            for month, month_updates in updates.groupby(months, sort=True):
+                if self.storage_format == "parquet":
+                    self._merge_partition(table, month, month_updates, manifest)
+                else:
+                    # Append; existing entries for the same keys are superseded on read
+                    self._append_rows(table, month, month_updates, manifest)
+            
+            self._note_dates(manifest, updates['date'])
+            self._write_manifest(table, manifest, self._data_signature(table))
+    
+    def _merge_partition(self, table, month, updates, manifest):
+        """Rewrite only the month partition the updates belong to; call with the table lock held"""
+        path = self._partition_path(table, month)
+        if os.path.exists(path):
+            _, existing, index = self._cached_table(path, table, lambda: pd.read_parquet(path))
+            old_size = os.path.getsize(path)
+        else:
+            existing, index = empty_frame(table), None
+            old_size = 0
+        
+        merged, merged_index = merge_frames(existing, updates, table, index)
+        self._write_partition(path, merged)
+        self._store_cache(path, _file_signature(path), merged, merged_index)
+        
+        manifest['row_count'] += len(merged) - len(existing)
+        manifest['size_bytes'] += os.path.getsize(path) - old_size
+    
+    def _append_rows(self, table, month, updates, manifest):
+        """Append rows to the end of a month shard without rewriting it; call with the table lock held"""
+        path = self._partition_path(table, month)
+        if not os.path.exists(path):
+            header = empty_frame(table).to_csv(index=False).encode('utf-8')
+            _atomic_write(path, lambda tmp_path: self._write_bytes(tmp_path, header))
+            manifest['size_bytes'] += len(header)
+        data = updates.to_csv(header=False, index=False, date_format=DATE_FORMAT).encode('utf-8')
+        
+        # The settled shard is needed to know how many entries the append adds;
+        # it is almost always cached already by the page that triggered the save
+        before, existing, index = self._cached_table(path, table, lambda: self._read_csv(path, table, None))
+        
+        # A crash mid-append can leave a partial last line, which readers skip.
+        # Cut it off rather than let the new rows complete it into an entry.
+        complete = _complete_length(path)
+        dropped = os.path.getsize(path) - complete
+        if dropped:
+            os.truncate(path, complete)
+        
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        try:
+            written = 0
+            while written < len(data):
+                written += os.write(fd, data[written:])
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        after = _file_signature(path)
+        
+        merged, merged_index = merge_frames(existing, updates, table, index)
+        manifest['row_count'] += len(merged) - len(existing)
+        manifest['size_bytes'] += len(data) - dropped
+        
+        # When the cache held exactly the file before this append, fold the
+        # rows into it instead of making the next load parse the file again
+        if before is not None and after is not None and after[1] == before[1] - dropped + len(data):
+            self._store_cache(path, after, merged, merged_index)
+        else:
+            self._invalidate_cache(path)
+    
+    def load_body_metrics(self, start=None, end=None, columns=None):
+        """Load body metrics data, optionally limited to a date range and a subset of columns"""
+        try:
+            return self._load_table('body_metrics', start, end, columns)
         except Exception as e:
             print(f"Error loading body metrics: {e}")
             return pd.DataFrame()
     
-    def load_workout_data(self):
-        """Load workout data"""
+    def load_workout_data(self, start=None, end=None, columns=None):
+        """Load workout data, optionally limited to a date range and a subset of columns"""
         try:
-            df = pd.read_csv(self.workout_data_file)
-            if not df.empty:
-                df['date'] = pd.to_datetime(df['date'])
-            return df
+            return self._load_table('workout_data', start, end, columns)
         except Exception as e:
             print(f"Error loading workout data: {e}")
             return pd.DataFrame()
     
-    def load_diet_data(self):
-        """Load diet data"""
+    def load_diet_data(self, start=None, end=None, columns=None):
+        """Load diet data, optionally limited to a date range and a subset of columns"""
         try:
-            df = pd.read_csv(self.diet_data_file)
-            if not df.empty:
-                df['date'] = pd.to_datetime(df['date'])
-            return df
+            return self._load_table('diet_data', start, end, columns)
         except Exception as e:
             print(f"Error loading diet data: {e}")
             return pd.DataFrame()
     
+    def load_all(self, start=None, end=None):
+        """Load body metrics, workout and diet data together, parsing the tables in parallel"""
+        loaders = [self.load_body_metrics, self.load_workout_data, self.load_diet_data]
+        with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+            futures = [pool.submit(loader, start, end) for loader in loaders]
+            return tuple(future.result() for future in futures)
+    
     def save_body_metrics(self, date, weight, fat_percentage, muscle_mass=None,
                          chest=None, waist=None, hips=None, arms=None, thighs=None, notes=""):
         """Save body metrics data"""
         try:
-            df = self.load_body_metrics()
             week = date.strftime("%Y-W%U")
             
             new_row = {
@@ -102,22 +724,7 @@ class DataManager:
                 'notes': notes
             }
             
-            # Check if entry for this date already exists
-            if not df.empty and 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                existing_entry = df[df['date'].dt.date == date.date()]
-                if not existing_entry.empty:
-                    # Update existing entry
-                    for col, value in new_row.items():
-                        df.loc[df['date'].dt.date == date.date(), col] = value
-                else:
-                    # Add new entry
-                    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            else:
-                # Add new entry
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            df.to_csv(self.body_metrics_file, index=False)
+            self._save_row('body_metrics', new_row)
             return True
         except Exception as e:
             print(f"Error saving body metrics: {e}")
@@ -127,7 +734,6 @@ class DataManager:
                          total_exercises, duration_minutes=None, intensity_rating=None, notes=""):
         """Save workout data"""
         try:
-            df = self.load_workout_data()
             week = date.strftime("%Y-W%U")
             
             new_row = {
@@ -143,22 +749,7 @@ class DataManager:
                 'notes': notes
             }
             
-            # Check if entry for this date and workout already exists
-            if not df.empty and 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                existing_entry = df[(df['date'].dt.date == date.date()) & (df['day'] == day)]
-                if not existing_entry.empty:
-                    # Update existing entry
-                    for col, value in new_row.items():
-                        df.loc[(df['date'].dt.date == date.date()) & (df['day'] == day), col] = value
-                else:
-                    # Add new entry
-                    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            else:
-                # Add new entry
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            df.to_csv(self.workout_data_file, index=False)
+            self._save_row('workout_data', new_row)
             return True
         except Exception as e:
             print(f"Error saving workout data: {e}")
@@ -168,7 +759,6 @@ class DataManager:
                       meals_followed=None, total_planned_meals=None, notes=""):
         """Save diet data"""
         try:
-            df = self.load_diet_data()
             week = date.strftime("%Y-W%U")
             
             new_row = {
@@ -182,65 +772,42 @@ class DataManager:
                 'notes': notes
             }
             
-            # Check if entry for this date already exists
-            if not df.empty and 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                existing_entry = df[(df['date'].dt.date == date.date()) & (df['day'] == day)]
-                if not existing_entry.empty:
-                    # Update existing entry
-                    for col, value in new_row.items():
-                        df.loc[(df['date'].dt.date == date.date()) & (df['day'] == day), col] = value
-                else:
-                    # Add new entry
-                    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            else:
-                # Add new entry
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            df.to_csv(self.diet_data_file, index=False)
+            self._save_row('diet_data', new_row)
             return True
         except Exception as e:
             print(f"Error saving diet data: {e}")
             return False
     
+    def save_batch(self, table, records):
+        """Save many records of one table with a single merge and a single write"""
+        try:
+            self.merge_records(table, records)
+            return True
+        except Exception as e:
+            print(f"Error saving {table} batch: {e}")
+            return False
+    
     def get_weekly_summary(self, week):
         """Get summary data for a specific week"""
-        body_metrics = self.load_body_metrics()
-        workout_data = self.load_workout_data()
-        diet_data = self.load_diet_data()
-        
-        summary = {
-            'week': week,
-            'body_metrics': body_metrics[body_metrics['week'] == week] if not body_metrics.empty else pd.DataFrame(),
-            'workout_data': workout_data[workout_data['week'] == week] if not workout_data.empty else pd.DataFrame(),
-            'diet_data': diet_data[diet_data['week'] == week] if not diet_data.empty else pd.DataFrame()
-        }
-        
-        # Calculate compliance scores
-        if not summary['workout_data'].empty:
-            summary['workout_compliance'] = (summary['workout_data']['completed'].sum() / len(summary['workout_data'])) * 100
-        else:
-            summary['workout_compliance'] = 0
-        
-        if not summary['diet_data'].empty:
-            summary['diet_compliance'] = (summary['diet_data']['adherence_score'].mean() / 5) * 100
-        else:
-            summary['diet_compliance'] = 0
-        
-        return summary
+        return build_weekly_summary(week, *self.load_all())
     
     def reset_all_data(self):
-        """Reset all data by recreating empty CSV files"""
+        """Reset all data by removing every shard"""
         try:
-            # Remove existing files
-            if os.path.exists(self.body_metrics_file):
-                os.remove(self.body_metrics_file)
-            if os.path.exists(self.workout_data_file):
-                os.remove(self.workout_data_file)
-            if os.path.exists(self.diet_data_file):
-                os.remove(self.diet_data_file)
+            for table in TABLE_COLUMNS:
+                with self._table_lock(table):
+                    if os.path.isdir(self._partition_dir(table)):
+                        shutil.rmtree(self._partition_dir(table))
+                    for storage_format in ("csv", "parquet"):
+                        manifest_path = os.path.join(self.data_dir, f"{table}.{storage_format}.manifest.json")
+                        if os.path.exists(manifest_path):
+                            os.remove(manifest_path)
+                    if os.path.exists(self._sync_path(table)):
+                        os.remove(self._sync_path(table))
+            with _frame_cache_lock:
+                _frame_cache.clear()
             
-            # Recreate empty files with headers
+            # Recreate empty shard directories
             self.initialize_files()
             return True
         except Exception as e:
@@ -248,42 +815,34 @@ class DataManager:
             return False
     
     def get_data_file_info(self):
-        """Get information about data files"""
+        """Get information about data files from the table manifests"""
         info = {
             'data_directory': os.path.abspath(self.data_dir),
             'files': []
         }
         
-        files_info = [
-            ('body_metrics.csv', self.body_metrics_file, 'Body measurements and metrics'),
-            ('workout_data.csv', self.workout_data_file, 'Workout completion and progress'),
-            ('diet_data.csv', self.diet_data_file, 'Diet adherence and nutrition tracking')
-        ]
+        descriptions = {
+            'body_metrics': 'Body measurements and metrics',
+            'workout_data': 'Workout completion and progress',
+            'diet_data': 'Diet adherence and nutrition tracking'
+        }
         
-        for name, path, description in files_info:
-            if os.path.exists(path):
-                file_size = os.path.getsize(path)
-                # Count rows (subtract 1 for header)
-                try:
-                    df = pd.read_csv(path)
-                    row_count = len(df)
-                except:
-                    row_count = 0
-                
-                info['files'].append({
-                    'name': name,
-                    'path': os.path.abspath(path),
-                    'description': description,
-                    'size_bytes': file_size,
-                    'row_count': row_count
-                })
-            else:
-                info['files'].append({
-                    'name': name,
-                    'path': os.path.abspath(path),
-                    'description': description,
-                    'size_bytes': 0,
-                    'row_count': 0
-                })
+        for table, description in descriptions.items():
+            try:
+                manifest = self.get_table_manifest(table)
+            except Exception as e:
+                print(f"Error reading {table} manifest: {e}")
+                manifest = {}
+            
+            info['files'].append({
+                'name': f"{table}/",
+                'path': os.path.abspath(self._partition_dir(table)),
+                'description': description,
+                'size_bytes': manifest.get('size_bytes', 0),
+                'row_count': manifest.get('row_count', 0),
+                'min_date': manifest.get('min_date'),
+                'max_date': manifest.get('max_date'),
+                'last_modified': manifest.get('last_modified')
+            })
         
-        return info
+        return info
\ No newline at end of file
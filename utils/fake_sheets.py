@@ -0,0 +1,386 @@
+import itertools
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+import gspread
+
+# Grid size of a new spreadsheet's first worksheet, as in Google Sheets
+DEFAULT_ROWS = 1000
+DEFAULT_COLS = 26
+
+_ids = itertools.count(1)
+
+class _FakeResponse:
+    """Just enough of a requests.Response for gspread's APIError"""
+    
+    def __init__(self, status_code, message, status):
+        self.status_code = status_code
+        self.text = message
+        self.reason = status
+        self._error = {'code': status_code, 'message': message, 'status': status}
+    
+    def json(self):
+        return {'error': self._error}
+
+def _api_error(status_code, message, status):
+    """The APIError gspread would raise for an error response"""
+    return gspread.exceptions.APIError(_FakeResponse(status_code, message, status))
+
+def _column_index(letters):
+    """Zero-based index of a column given as letters, e.g. "A" -> 0, "AA" -> 26"""
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+def _parse_range(a1):
+    """(sheet title or None, first row, last row, first col, last col) of an A1 range; None means open-ended"""
+    title, _, cells = a1.rpartition('!')
+    if not title and not re.fullmatch(r"[A-Za-z]*\d*(:[A-Za-z]*\d*)?", cells):
+        # A bare worksheet title
+        title, cells = cells, ''
+    title = title.strip("'") or None
+    if not cells:
+        return title, None, None, None, None
+    
+    bounds = []
+    for cell in cells.split(':'):
+        letters, digits = re.fullmatch(r"([A-Za-z]*)(\d*)", cell).groups()
+        bounds.append((
+            int(digits) if digits else None,
+            _column_index(letters) if letters else None
+        ))
+    (first_row, first_col), (last_row, last_col) = bounds[0], bounds[-1]
+    return title, first_row, last_row, first_col, last_col
+
+def _user_entered(value):
+    """Value as Google Sheets stores what a user typed: numbers and booleans are parsed"""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if text.upper() in ('TRUE', 'FALSE'):
+        return text.upper() == 'TRUE'
+    try:
+        number = float(text)
+        return int(number) if number.is_integer() and '.' not in text and 'e' not in text.lower() else number
+    except ValueError:
+        return value
+
+def _formatted(value):
+    """Value as the Sheets UI shows it (FORMATTED_VALUE)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _numericise(value):
+    """gspread's get_all_records conversion of a formatted cell"""
+    if value == '':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+def _trim_values(rows):
+    """Drop trailing empty cells and rows, as the Sheets API does in value ranges"""
+    trimmed = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        trimmed.append(row)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+class FakeSheetsClient:
+    """
+    In-process stand-in for an authorised gspread client, for testing and
+    benchmarking SheetsManager without credentials or network. Every API
+    call sleeps `latency` (plus up to `jitter`) seconds, counts against
+    per-minute read and write quotas (exceeding one raises a 429 APIError
+    like Google does) and fails with a 503 with probability `error_rate`.
+    """
+    
+    def __init__(self, latency=0.0, jitter=0.0, reads_per_minute=None, writes_per_minute=None,
+                 error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.quotas = {'read': reads_per_minute, 'write': writes_per_minute}
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.spreadsheets = {}
+        # API calls made, by method name, and quota rejections, by kind
+        self.calls = Counter()
+        self.rejections = Counter()
+        self._recent = {'read': deque(), 'write': deque()}
+        self.lock = threading.RLock()
+    
+    def _request(self, kind, name):
+        """Account for one API request: latency, quota and injected failures"""
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        
+        with self.lock:
+            self.calls[name] += 1
+            quota = self.quotas[kind]
+            if quota is not None:
+                now = time.monotonic()
+                recent = self._recent[kind]
+                while recent and now - recent[0] >= 60:
+                    recent.popleft()
+                if len(recent) >= quota:
+                    self.rejections[kind] += 1
+                    raise _api_error(
+                        429,
+                        f"Quota exceeded for quota metric '{kind.title()} requests' per minute per user",
+                        'RESOURCE_EXHAUSTED'
+                    )
+                recent.append(now)
+            if self.error_rate and self.random.random() < self.error_rate:
+                raise _api_error(503, "The service is currently unavailable.", 'UNAVAILABLE')
+    
+    def reset_stats(self):
+        """Forget counted calls and quota usage, e.g. between benchmark runs"""
+        with self.lock:
+            self.calls.clear()
+            self.rejections.clear()
+            for recent in self._recent.values():
+                recent.clear()
+    
+    def create(self, title, folder_id=None):
+        """Create an empty spreadsheet"""
+        self._request('write', 'create')
+        with self.lock:
+            spreadsheet = FakeSpreadsheet(self, title)
+            self.spreadsheets[spreadsheet.url] = spreadsheet
+            return spreadsheet
+    
+    def open_by_url(self, url):
+        """Open a spreadsheet; an unknown URL gets a new empty one, so tests need no setup"""
+        self._request('read', 'open_by_url')
+        with self.lock:
+            if url not in self.spreadsheets:
+                self.spreadsheets[url] = FakeSpreadsheet(self, "Fitness Tracker Data", url)
+            return self.spreadsheets[url]
+
+class FakeSpreadsheet:
+    """A spreadsheet held in memory"""
+    
+    def __init__(self, client, title, url=None):
+        self.client = client
+        self.id = f"fake-spreadsheet-{next(_ids)}"
+        self.title = title
+        self.url = url or f"https://docs.google.com/spreadsheets/d/{self.id}"
+        self.sheets = {}
+        self.updated = datetime.now(timezone.utc)
+        self.add_worksheet("Sheet1", DEFAULT_ROWS, DEFAULT_COLS, _request=False)
+    
+    def _touch(self):
+        """Record a change for get_lastUpdateTime; always moves forward"""
+        now = datetime.now(timezone.utc)
+        self.updated = now if now > self.updated else self.updated + timedelta(milliseconds=1)
+    
+    def worksheet(self, title):
+        """Worksheet by title"""
+        self.client._request('read', 'worksheet')
+        with self.client.lock:
+            if title not in self.sheets:
+                raise gspread.WorksheetNotFound(title)
+            return self.sheets[title]._refreshed()
+    
+    def worksheets(self, exclude_hidden=False):
+        """Every worksheet, in order"""
+        self.client._request('read', 'worksheets')
+        with self.client.lock:
+            return [worksheet._refreshed() for worksheet in self.sheets.values()]
+    
+    def add_worksheet(self, title, rows, cols, index=None, _request=True):
+        """Add an empty worksheet"""
+        if _request:
+            self.client._request('write', 'add_worksheet')
+        with self.client.lock:
+            if title in self.sheets:
+                raise _api_error(
+                    400,
+                    f'A sheet with the name "{title}" already exists. Please enter another name.',
+                    'INVALID_ARGUMENT'
+                )
+            worksheet = FakeWorksheet(self, title, rows, cols)
+            self.sheets[title] = worksheet
+            self._touch()
+            return worksheet
+    
+    def get_lastUpdateTime(self):
+        """Time of the last change, as the Drive API reports it"""
+        self.client._request('read', 'get_lastUpdateTime')
+        with self.client.lock:
+            return self.updated.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    
+    def values_batch_get(self, ranges, params=None):
+        """Several ranges in one request"""
+        self.client._request('read', 'values_batch_get')
+        render = (params or {}).get('valueRenderOption', 'FORMATTED_VALUE')
+        with self.client.lock:
+            value_ranges = []
+            for a1 in ranges:
+                title, *bounds = _parse_range(a1)
+                if title not in self.sheets:
+                    raise _api_error(400, f"Unable to parse range: {a1}", 'INVALID_ARGUMENT')
+                value_ranges.append({
+                    'range': a1,
+                    'majorDimension': 'ROWS',
+                    'values': self.sheets[title]._values(*bounds, render=render)
+                })
+            return {'spreadsheetId': self.id, 'valueRanges': value_ranges}
+
+class FakeWorksheet:
+    """
+    A worksheet held in memory; cells keep the value Sheets would store.
+    row_count and col_count are the handle's cached grid size, which drifts
+    like gspread's: appends raise row_count by the rows appended even when
+    the grid doesn't grow. Looking the worksheet up again refreshes them.
+    """
+    
+    def __init__(self, spreadsheet, title, rows, cols):
+        self.spreadsheet = spreadsheet
+        self.client = spreadsheet.client
+        self.id = next(_ids)
+        self.title = title
+        # Real grid size, as the API sees it
+        self.grid_rows = rows
+        self.grid_cols = cols
+        self.row_count = rows
+        self.col_count = cols
+        self.cells = []
+    
+    def _refreshed(self):
+        """The worksheet with its cached grid size re-read, as a fresh lookup returns it"""
+        self.row_count = self.grid_rows
+        self.col_count = self.grid_cols
+        return self
+    
+    def _store(self, values, value_input_option):
+        """Cell values as stored for the given input option"""
+        if str(value_input_option).upper() == 'USER_ENTERED':
+            return [_user_entered(value) for value in values]
+        return ['' if value is None else value for value in values]
+    
+    def _changed(self):
+        """Grow the grid to fit the cells and mark the spreadsheet as updated"""
+        self.grid_rows = max(self.grid_rows, len(self.cells))
+        self.grid_cols = max([self.grid_cols] + [len(row) for row in self.cells])
+        self.spreadsheet._touch()
+    
+    def _values(self, first_row=None, last_row=None, first_col=None, last_col=None, render='FORMATTED_VALUE'):
+        """Values of a range, trimmed like an API response"""
+        first_row = (first_row or 1) - 1
+        last_row = last_row if last_row is not None else len(self.cells)
+        first_col = first_col or 0
+        rows = []
+        for row in self.cells[first_row:last_row]:
+            row = row[first_col:] if last_col is None else row[first_col:last_col + 1]
+            if render == 'FORMATTED_VALUE':
+                row = [_formatted(value) for value in row]
+            rows.append(row)
+        return _trim_values(rows)
+    
+    def append_row(self, values, value_input_option='RAW', **kwargs):
+        """Append one row after the last non-empty one"""
+        return self.append_rows([values], value_input_option, _name='append_row')
+    
+    def append_rows(self, values, value_input_option='RAW', _name='append_rows', **kwargs):
+        """Append rows after the last non-empty one"""
+        self.client._request('write', _name)
+        with self.client.lock:
+            self.cells = _trim_values(self.cells)
+            self.cells.extend(self._store(row, value_input_option) for row in values)
+            self._changed()
+            # gspread assumes the grid grew by the appended rows
+            self.row_count += len(values)
+        return {'updates': {'updatedRows': len(values)}}
+    
+    def update(self, range_name, values, value_input_option='RAW', **kwargs):
+        """Overwrite the cells of one range"""
+        self.client._request('write', 'update')
+        with self.client.lock:
+            self._write_range(range_name, values, value_input_option)
+            self._changed()
+    
+    def batch_update(self, data, value_input_option='RAW', **kwargs):
+        """Overwrite the cells of several ranges in one request"""
+        self.client._request('write', 'batch_update')
+        with self.client.lock:
+            for item in data:
+                self._write_range(item['range'], item['values'], value_input_option)
+            self._changed()
+    
+    def _write_range(self, range_name, values, value_input_option):
+        """Write rows of values starting at a range's top-left cell"""
+        _, first_row, _, first_col, _ = _parse_range(range_name)
+        first_row = (first_row or 1) - 1
+        first_col = first_col or 0
+        for offset, row in enumerate(values):
+            while len(self.cells) <= first_row + offset:
+                self.cells.append([])
+            cells = self.cells[first_row + offset]
+            cells.extend([''] * (first_col + len(row) - len(cells)))
+            cells[first_col:first_col + len(row)] = self._store(row, value_input_option)
+    
+    def delete_rows(self, start_index, end_index=None):
+        """Delete rows start_index to end_index (1-based, inclusive), shrinking the grid"""
+        self.client._request('write', 'delete_rows')
+        end_index = end_index or start_index
+        with self.client.lock:
+            if end_index >= self.grid_rows and start_index <= 1:
+                raise _api_error(
+                    400,
+                    "Invalid requests[0].deleteDimension: You can't delete all the rows in the sheet.",
+                    'INVALID_ARGUMENT'
+                )
+            if end_index > self.grid_rows:
+                raise _api_error(
+                    400,
+                    f"Invalid requests[0].deleteDimension: Cannot delete rows past the end of the grid ({self.grid_rows} rows).",
+                    'INVALID_ARGUMENT'
+                )
+            del self.cells[start_index - 1:end_index]
+            self.grid_rows -= end_index - start_index + 1
+            self.row_count -= end_index - start_index + 1
+            self.spreadsheet._touch()
+    
+    def get(self, range_name=None, value_render_option='FORMATTED_VALUE', **kwargs):
+        """Values of one range"""
+        self.client._request('read', 'get')
+        with self.client.lock:
+            if range_name is None:
+                return self._values(render=value_render_option)
+            _, *bounds = _parse_range(range_name)
+            return self._values(*bounds, render=value_render_option)
+    
+    def get_all_values(self, **kwargs):
+        """Every value as formatted text, rows padded to the same width like gspread does"""
+        self.client._request('read', 'get_all_values')
+        with self.client.lock:
+            rows = self._values()
+        width = max((len(row) for row in rows), default=0)
+        return [row + [''] * (width - len(row)) for row in rows]
+    
+    def get_all_records(self, head=1, **kwargs):
+        """Rows after the header as dicts, with numbers parsed like gspread's default"""
+        rows = self.get_all_values()
+        if len(rows) < head:
+            return []
+        header = rows[head - 1]
+        return [dict(zip(header, [_numericise(value) for value in row])) for row in rows[head:]]
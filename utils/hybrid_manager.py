@@ -1,20 +1,59 @@
 import streamlit as st
-from utils.data_manager import DataManager
-from utils.sheets_manager import SheetsManager
+import os
+from utils.data_manager import DataManager, build_weekly_summary, PARQUET_AVAILABLE
+from utils.sheets_manager import SheetsManager, _secret
+from utils.sheets_replicator import get_replicator
+from utils.sqlite_manager import SQLiteManager
+
+def _storage_backend():
+    """Read the configured local backend ("csv", "parquet" or "sqlite") from Streamlit secrets"""
+    try:
+        return str(st.secrets.get("storage_backend", "csv")).lower()
+    except Exception:
+        return "csv"
 
 class HybridManager:
     """
     Hybrid data manager that uses Google Sheets when available,
-    falls back to CSV files when not connected
+    falls back to local storage (CSV files or SQLite) when not connected.
+    With sheets_mode = "mirror" it reads and writes the local store and a
+    background replicator keeps Google Sheets in sync.
     """
     
     def __init__(self):
         self.sheets_manager = SheetsManager()
-        self.csv_manager = DataManager()
-        self.use_sheets = self.sheets_manager.is_connected()
+        self.backend = _storage_backend()
+        if self.backend == "parquet" and not PARQUET_AVAILABLE:
+            st.warning("Parquet storage needs pyarrow installed; using CSV files instead")
+            self.backend = "csv"
         
-        if self.use_sheets:
+        if self.backend == "sqlite":
+            self.local_manager = SQLiteManager()
+        elif self.backend == "parquet":
+            self.local_manager = DataManager(storage_format="parquet")
+        else:
+            self.local_manager = DataManager()
+        self.use_sqlite = self.backend == "sqlite"
+        self.mirror = self.sheets_manager.is_connected() and _secret("sheets_mode", "direct").lower() == "mirror"
+        self.use_sheets = self.sheets_manager.is_connected() and not self.mirror
+        self.replicator = None
+        if self.mirror:
+            self.replicator = get_replicator(
+                self.local_manager,
+                self.sheets_manager,
+                os.path.join(self.local_manager.data_dir, "sheets_outbox.jsonl"),
+                _secret("sheets_push_seconds", 5.0),
+                _secret("sheets_pull_seconds", 60.0)
+            )
+        
+        if self.mirror:
+            st.success("Using local storage, mirrored to Google Sheets in the background")
+        elif self.use_sheets:
             st.success("Connected to Google Sheets for data storage")
+        elif self.use_sqlite:
+            st.info("Using local SQLite database for data storage")
+        elif self.backend == "parquet":
+            st.info("Using local Parquet files for data storage")
         else:
             st.info("Using local CSV files for data storage")
     
@@ -22,54 +61,101 @@ class HybridManager:
         """Check if currently using Google Sheets"""
         return self.use_sheets
     
-    def save_body_metrics(self, data):
-        """Save body metrics data"""
+    def _sheets_record(self, data):
+        """Add the derived week column the Sheets rows expect"""
+        record = dict(data)
+        if 'week' not in record and 'date' in record:
+            record['week'] = record['date'].strftime("%Y-W%U")
+        return record
+    
+    def _save(self, table, data):
+        """Save one record; in mirror mode it is also queued for the replicator"""
         if self.use_sheets:
-            return self.sheets_manager.save_body_metrics(data)
-        else:
-            return self.csv_manager.save_body_metrics(data)
+            return getattr(self.sheets_manager, f"save_{table}")(self._sheets_record(data))
+        
+        saved = getattr(self.local_manager, f"save_{table}")(**data)
+        if saved and self.mirror:
+            self.replicator.outbox.append(table, [self._sheets_record(data)])
+        return saved
+    
+    def save_body_metrics(self, **data):
+        """Save body metrics data"""
+        return self._save('body_metrics', data)
     
-    def save_workout_data(self, data):
+    def save_workout_data(self, **data):
         """Save workout data"""
+        return self._save('workout_data', data)
+    
+    def save_diet_data(self, **data):
+        """Save diet data"""
+        return self._save('diet_data', data)
+    
+    def save_batch(self, table, records):
+        """Save many records of one table ("body_metrics", "workout_data" or "diet_data") at once"""
         if self.use_sheets:
-            return self.sheets_manager.save_workout_data(data)
+            return self.sheets_manager.save_batch(table, [self._sheets_record(data) for data in records])
+        
+        saved = self.local_manager.save_batch(table, records)
+        if saved and self.mirror:
+            self.replicator.outbox.append(table, [self._sheets_record(data) for data in records])
+        return saved
+    
+    def load_body_metrics(self, start=None, end=None, columns=None):
+        """Load body metrics data, optionally limited to a date range and a subset of columns"""
+        if self.use_sheets:
+            return self.sheets_manager.load_body_metrics(start, end, columns)
         else:
-            return self.csv_manager.save_workout_data(data)
+            return self.local_manager.load_body_metrics(start, end, columns)
     
-    def save_diet_data(self, data):
-        """Save diet data"""
+    def load_workout_data(self, start=None, end=None, columns=None):
+        """Load workout data, optionally limited to a date range and a subset of columns"""
         if self.use_sheets:
-            return self.sheets_manager.save_diet_data(data)
+            return self.sheets_manager.load_workout_data(start, end, columns)
         else:
-            return self.csv_manager.save_diet_data(data)
+            return self.local_manager.load_workout_data(start, end, columns)
     
-    def load_body_metrics(self):
-        """Load body metrics data"""
+    def load_diet_data(self, start=None, end=None, columns=None):
+        """Load diet data, optionally limited to a date range and a subset of columns"""
         if self.use_sheets:
-            return self.sheets_manager.load_body_metrics()
+            return self.sheets_manager.load_diet_data(start, end, columns)
         else:
-            return self.csv_manager.load_body_metrics()
+            return self.local_manager.load_diet_data(start, end, columns)
     
-    def load_workout_data(self):
-        """Load workout data"""
+    def load_all(self, start=None, end=None):
+        """Load (body_metrics, workout_data, diet_data) together, optionally limited to a date range"""
         if self.use_sheets:
-            return self.sheets_manager.load_workout_data()
+            return self.sheets_manager.load_all(start, end)
         else:
-            return self.csv_manager.load_workout_data()
+            return self.local_manager.load_all(start, end)
+    
+    def get_latest_dates(self):
+        """Date of the newest entry in each table, from the local table info; None when reading Google Sheets directly"""
+        if self.use_sheets:
+            return None
+        return {
+            entry['name'].rstrip('/'): entry.get('max_date') if entry.get('row_count') else None
+            for entry in self.local_manager.get_data_file_info()['files']
+        }
     
-    def load_diet_data(self):
-        """Load diet data"""
+    def get_weekly_summary(self, week):
+        """Get summary data for a specific week"""
         if self.use_sheets:
-            return self.sheets_manager.load_diet_data()
+            return build_weekly_summary(week, *self.sheets_manager.load_all())
         else:
-            return self.csv_manager.load_diet_data()
+            return self.local_manager.get_weekly_summary(week)
     
     def reset_all_data(self):
         """Reset all data"""
         if self.use_sheets:
             return self.sheets_manager.reset_all_data()
+        elif self.mirror:
+            # Hold the replicator off so it can't pull old rows back mid-reset
+            with self.replicator.lock:
+                self.replicator.outbox.clear()
+                sheets_reset = self.sheets_manager.reset_all_data()
+                return self.local_manager.reset_all_data() and sheets_reset
         else:
-            return self.csv_manager.reset_all_data()
+            return self.local_manager.reset_all_data()
     
     def get_storage_info(self):
         """Get information about current storage system"""
@@ -80,14 +166,22 @@ class HybridManager:
                     'storage_type': 'Google Sheets',
                     'location': sheets_info['url'],
                     'title': sheets_info['title'],
-                    'worksheets': sheets_info['worksheets']
+                    'worksheets': sheets_info['worksheets'],
+                    'api_metrics': sheets_info['api_metrics']
                 }
             else:
                 return {'storage_type': 'Google Sheets', 'status': 'Connection failed'}
         else:
-            csv_info = self.csv_manager.get_data_file_info()
-            return {
-                'storage_type': 'Local CSV Files',
-                'location': csv_info['data_directory'],
-                'files': csv_info['files']
-            }
\ No newline at end of file
+            local_info = self.local_manager.get_data_file_info()
+            info = {
+                'storage_type': {
+                    'sqlite': 'Local SQLite Database',
+                    'parquet': 'Local Parquet Files'
+                }.get(self.backend, 'Local CSV Files'),
+                'location': local_info['data_directory'],
+                'files': local_info['files']
+            }
+            if self.mirror:
+                info['storage_type'] += ' (mirrored to Google Sheets)'
+                info['replication'] = self.replicator.status()
+            return info
\ No newline at end of file
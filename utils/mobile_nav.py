@@ -202,4 +202,17 @@ def add_floating_action_button(text="💾 Save", color="#4ECDC4"):
     </style>
     
     <button class="fab">{text}</button>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+def estimate_viewport_width():
+    """Rough screen width in CSS pixels, judged from the browser's user agent"""
+    try:
+        user_agent = st.context.headers.get("User-Agent", "")
+    except Exception:
+        user_agent = ""
+    
+    if "iPad" in user_agent or "Tablet" in user_agent:
+        return 768
+    if "Mobi" in user_agent or "Android" in user_agent:
+        return 400
+    return 1280
@@ -0,0 +1,110 @@
+import pandas as pd
+
+# Column dtypes of each table, in file order. Every backend coerces its
+# frames through apply_schema so they all return identical dtypes.
+TABLE_SCHEMAS = {
+    'body_metrics': {
+        'date': 'datetime64[ns]',
+        'week': 'category',
+        'weight': 'float32',
+        'fat_percentage': 'float32',
+        'muscle_mass': 'float32',
+        'chest': 'float32',
+        'waist': 'float32',
+        'hips': 'float32',
+        'arms': 'float32',
+        'thighs': 'float32',
+        'notes': 'object'
+    },
+    'workout_data': {
+        'date': 'datetime64[ns]',
+        'week': 'category',
+        'day': 'category',
+        'workout_type': 'category',
+        'completed': 'bool',
+        'exercises_completed': 'Int16',
+        'total_exercises': 'Int16',
+        'duration_minutes': 'Int16',
+        'intensity_rating': 'Int8',
+        'notes': 'object'
+    },
+    'diet_data': {
+        'date': 'datetime64[ns]',
+        'week': 'category',
+        'day': 'category',
+        'adherence_score': 'Int8',
+        'calories_estimated': 'Int16',
+        'meals_followed': 'Int8',
+        'total_planned_meals': 'Int8',
+        'notes': 'object'
+    }
+}
+
+# Column layout of each table, in file order
+TABLE_COLUMNS = {table: list(schema) for table, schema in TABLE_SCHEMAS.items()}
+
+# Columns identifying one logical entry; later rows with the same key win
+TABLE_KEYS = {
+    'body_metrics': ['date'],
+    'workout_data': ['date', 'day'],
+    'diet_data': ['date', 'day']
+}
+
+# Dates are stored as plain days; anything after the first 10 characters
+# (e.g. a " 00:00:00" time written by older versions) is ignored
+DATE_FORMAT = '%Y-%m-%d'
+
+def csv_dtypes(table, columns=None):
+    """dtype argument for pd.read_csv so the parser skips type inference"""
+    dtypes = {}
+    for col, dtype in TABLE_SCHEMAS[table].items():
+        if columns is not None and col not in columns:
+            continue
+        if dtype == 'datetime64[ns]':
+            dtypes[col] = 'object'
+        elif dtype == 'bool':
+            # Missing values are allowed on disk and become False in apply_schema
+            dtypes[col] = 'boolean'
+        else:
+            dtypes[col] = dtype
+    return dtypes
+
+def parse_dates(values):
+    """Parse a date column with the explicit storage format"""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values.astype(str).str.slice(0, 10), format=DATE_FORMAT, errors='coerce')
+    return values.astype('datetime64[ns]')
+
+def _coerce(values, dtype):
+    """Convert one column to its schema dtype"""
+    if dtype == 'datetime64[ns]':
+        return parse_dates(values)
+    if dtype == 'bool':
+        if values.dtype == object or pd.api.types.is_string_dtype(values):
+            return values.astype(str).str.strip().str.lower() == 'true'
+        return values.fillna(False).astype(bool)
+    if dtype == 'category':
+        return values.astype('category')
+    if dtype == 'object':
+        return values.astype(object)
+    numbers = pd.to_numeric(values, errors='coerce')
+    if dtype.startswith('Int'):
+        numbers = numbers.round()
+    return numbers.astype(dtype)
+
+def apply_schema(df, table):
+    """Coerce every known column of a frame to the table's schema dtypes"""
+    schema = TABLE_SCHEMAS[table]
+    if df.empty and len(df.columns) == 0:
+        return df
+
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if col in schema and str(df[col].dtype) != schema[col]:
+            df[col] = _coerce(df[col], schema[col])
+    return df
+
+def empty_frame(table, columns=None):
+    """Typed frame with no rows"""
+    columns = columns if columns is not None else TABLE_COLUMNS[table]
+    return apply_schema(pd.DataFrame(columns=columns), table)
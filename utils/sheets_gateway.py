@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+import gspread
+
+# Google Sheets API limits per user: 60 read and 60 write requests per minute
+DEFAULT_READS_PER_MINUTE = 60
+DEFAULT_WRITES_PER_MINUTE = 60
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Allows bursts of up to `capacity` calls, refilled at `capacity` per minute"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60.0)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) * 60.0 / self.capacity
+            time.sleep(delay)
+            waited += delay
+
+def _status_code(error):
+    """HTTP status of a gspread API error, if it has one"""
+    code = getattr(error, 'code', None)
+    if code is None:
+        code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return code
+
+class SheetsGateway:
+    """
+    Single path for every Google Sheets API call: waits for quota, retries
+    rate-limit and server errors with exponential backoff and jitter, and
+    counts what happened
+    """
+    
+    def __init__(self, reads_per_minute=DEFAULT_READS_PER_MINUTE, writes_per_minute=DEFAULT_WRITES_PER_MINUTE,
+                 max_retries=5, base_delay=1.0, max_delay=32.0):
+        self.buckets = {
+            'read': TokenBucket(reads_per_minute),
+            'write': TokenBucket(writes_per_minute)
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        # Called when a request is rejected as unauthorised, e.g. to reconnect
+        self.unauthorized_handlers = []
+        self.metrics = {
+            'read_calls': 0,
+            'write_calls': 0,
+            'retries': 0,
+            'failures': 0,
+            'throttled_seconds': 0.0,
+            'backoff_seconds': 0.0,
+            'last_error': None
+        }
+    
+    def configure(self, reads_per_minute, writes_per_minute):
+        """Change the quotas, e.g. from Streamlit secrets"""
+        self.buckets['read'].capacity = reads_per_minute
+        self.buckets['write'].capacity = writes_per_minute
+    
+    def _count(self, name, amount=1):
+        """Add to one of the metrics"""
+        with self.lock:
+            self.metrics[name] += amount
+    
+    def _retryable(self, error):
+        """Whether a failed call is worth trying again"""
+        if isinstance(error, gspread.exceptions.APIError):
+            return _status_code(error) in RETRY_STATUSES
+        # Dropped connections and timeouts (requests' errors are OSErrors)
+        return isinstance(error, OSError)
+    
+    def call(self, kind, func, *args, **kwargs):
+        """Run one API call ("read" or "write") within quota, retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            self._count('throttled_seconds', self.buckets[kind].acquire())
+            self._count(f"{kind}_calls")
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if isinstance(e, gspread.exceptions.APIError) and _status_code(e) == 401:
+                    for handler in self.unauthorized_handlers:
+                        handler()
+                if not self._retryable(e) or attempt == self.max_retries:
+                    self._count('failures')
+                    with self.lock:
+                        self.metrics['last_error'] = str(e)
+                    raise
+                
+                # Truncated exponential backoff with jitter, as Google recommends
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) + random.uniform(0, 1)
+                self._count('retries')
+                self._count('backoff_seconds', delay)
+                time.sleep(delay)
+    
+    def read(self, func, *args, **kwargs):
+        """Run a read call through the gateway"""
+        return self.call('read', func, *args, **kwargs)
+    
+    def write(self, func, *args, **kwargs):
+        """Run a write call through the gateway"""
+        return self.call('write', func, *args, **kwargs)
+    
+    def get_metrics(self):
+        """Snapshot of the call counters"""
+        with self.lock:
+            return dict(self.metrics)
+
+# One gateway per process: the quotas are per user, not per session
+gateway = SheetsGateway()
@@ -1,241 +1,700 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import gspread
 from google.oauth2.service_account import Credentials
 import json
 from datetime import datetime, date
 import os
+import atexit
+import threading
+import time
+from utils.data_manager import filter_frame, settle_frame, _cache_copy
+from utils.sheets_gateway import gateway
+from utils.schemas import TABLE_SCHEMAS, TABLE_COLUMNS, TABLE_KEYS, DATE_FORMAT, apply_schema, empty_frame, parse_dates
+
+# Reads ask for raw cell values, so numbers and booleans arrive typed instead
+# of as display text; dates come back as the text they were entered as
+VALUE_RENDER_PARAMS = {'valueRenderOption': 'UNFORMATTED_VALUE', 'dateTimeRenderOption': 'FORMATTED_STRING'}
+
+# Authorised client and spreadsheet handle shared by every SheetsManager in the
+# process, plus worksheet handles per (spreadsheet id, title) and when a load
+# last found each missing worksheet
+_connection = {}
+_worksheets = {}
+_missing_worksheets = {}
+_connection_lock = threading.RLock()
+
+def reset_connection():
+    """Drop the shared client and handles, e.g. when credentials expired; the next SheetsManager reconnects"""
+    with _connection_lock:
+        _connection.clear()
+        _worksheets.clear()
+        _missing_worksheets.clear()
+
+gateway.unauthorized_handlers.append(reset_connection)
+
+# Pending rows per (spreadsheet id, worksheet), shared by every SheetsManager
+# in the process so saves from different reruns and sessions coalesce
+_write_buffers = {}
+_write_buffers_lock = threading.Lock()
+
+# Downloaded worksheets per (spreadsheet id, worksheet), shared across sessions.
+# Each entry remembers the last row seen so later loads fetch only new rows.
+_read_cache = {}
+_read_cache_lock = threading.Lock()
+
+def _invalidate_read_cache(key):
+    """Forget a worksheet's cached frame so the next load downloads it in full"""
+    with _read_cache_lock:
+        _read_cache.pop(key, None)
+
+def _expire_read_cache(key):
+    """Make the next load fetch a worksheet's new rows, e.g. after appending to it"""
+    with _read_cache_lock:
+        entry = _read_cache.get(key)
+        if entry is not None:
+            # The Drive revision can lag behind an append, so don't trust it
+            _read_cache[key] = dict(entry, checked=float('-inf'), revision=None)
+
+def _trim(row):
+    """Row values without trailing blanks, so rows compare equal however their range was fetched"""
+    row = list(row)
+    while row and row[-1] == '':
+        row.pop()
+    return row
+
+def _cell_text(value):
+    """Text of a raw cell value, as the worksheet displays it"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return '' if value is None else str(value)
+
+def _typed_column(values, dtype):
+    """Build one column in its schema dtype straight from raw cell values"""
+    if dtype == 'datetime64[ns]':
+        return parse_dates(pd.Series(np.array(values, dtype=object))).to_numpy()
+    if dtype == 'bool':
+        # Sheets booleans, or "True"/"False" text written by str()
+        return np.fromiter(
+            (value is True or (isinstance(value, str) and value.strip().lower() == 'true') for value in values),
+            dtype=bool,
+            count=len(values)
+        )
+    if dtype in ('category', 'object'):
+        text = np.array(values, dtype=object)
+        if any(not isinstance(value, str) for value in values):
+            text = np.array([_cell_text(value) for value in values], dtype=object)
+        return pd.Categorical(text) if dtype == 'category' else text
+    
+    numbers = np.array(values, dtype=object)
+    numbers[numbers == ''] = np.nan
+    try:
+        numbers = numbers.astype(np.float64)
+    except (TypeError, ValueError):
+        # Text in a number column becomes missing, as pd.to_numeric(errors='coerce') would make it
+        numbers = pd.to_numeric(pd.Series(numbers), errors='coerce').to_numpy(np.float64)
+    if dtype.startswith('Int'):
+        return pd.array(np.round(numbers), dtype=dtype)
+    return numbers.astype(dtype)
+
+class WorksheetWriteBuffer:
+    """Rows waiting to be appended to one worksheet with a single append_rows call"""
+    
+    def __init__(self, key, worksheet, max_rows, max_age):
+        self.key = key
+        self.worksheet = worksheet
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.rows = []
+        self.keys = []
+        self.positions = {}
+        self.timer = None
+        self.lock = threading.RLock()
+    
+    def add(self, rows, keys=None):
+        """Queue rows, flushing once the buffer is full; a row replaces a pending row with the same key"""
+        with self.lock:
+            for row, key in zip(rows, keys or [None] * len(rows)):
+                if key is not None and key in self.positions:
+                    self.rows[self.positions[key]] = row
+                    continue
+                if key is not None:
+                    self.positions[key] = len(self.rows)
+                self.rows.append(row)
+                self.keys.append(key)
+            
+            if len(self.rows) >= self.max_rows:
+                self.flush()
+            else:
+                self._schedule()
+    
+    def _schedule(self):
+        """Flush whatever is pending once the oldest row is max_age seconds old"""
+        if self.timer is None:
+            self.timer = threading.Timer(self.max_age, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+    
+    def flush(self):
+        """Append every pending row; on failure they stay queued for the next flush"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.rows:
+                return True
+            
+            rows, keys = self.rows, self.keys
+            self.rows, self.keys, self.positions = [], [], {}
+            try:
+                gateway.write(self.worksheet.append_rows, rows)
+                _expire_read_cache(self.key)
+                return True
+            except Exception as e:
+                print(f"Error flushing rows to {self.worksheet.title}: {e}")
+                # Put the rows back in front without calling add(), which could flush again
+                self.rows = rows + self.rows
+                self.keys = keys + self.keys
+                self.positions = {key: i for i, key in enumerate(self.keys) if key is not None}
+                self._schedule()
+                return False
+    
+    def discard(self):
+        """Drop pending rows without writing them"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.rows, self.keys, self.positions = [], [], {}
+
+def flush_write_buffers():
+    """Flush every worksheet's pending rows; also runs at interpreter shutdown"""
+    with _write_buffers_lock:
+        buffers = list(_write_buffers.values())
+    return all([buffer.flush() for buffer in buffers])
+
+atexit.register(flush_write_buffers)
+
+def _secret(name, default):
+    """Read an optional setting from Streamlit secrets"""
+    try:
+        return type(default)(st.secrets.get(name, default))
+    except Exception:
+        return default
 
 class SheetsManager:
-    def __init__(self):
+    def __init__(self, client=None):
         self.client = None
         self.spreadsheet = None
-        self._connect()
+        # Saves are buffered until this many rows are pending or the oldest is this many seconds old
+        self.write_batch_rows = _secret("sheets_write_batch_rows", 50)
+        self.write_batch_seconds = _secret("sheets_write_batch_seconds", 2.0)
+        # Cached worksheets are reused without any API call for this many seconds
+        self.cache_ttl = _secret("sheets_cache_ttl", 60.0)
+        # Incremental loads can't see edits above the last row read, so resync in full this often
+        self.full_sync_seconds = _secret("sheets_full_sync_seconds", 900.0)
+        gateway.configure(
+            _secret("sheets_reads_per_minute", 60),
+            _secret("sheets_writes_per_minute", 60)
+        )
+        if client is not None:
+            # An already authorised client, e.g. utils.fake_sheets.FakeSheetsClient for offline tests
+            self._connect_client(client)
+        else:
+            self._connect()
     
     def _connect(self):
-        """Connect to Google Sheets using service account credentials"""
+        """Use the process's Google Sheets connection, connecting on first use"""
+        try:
+            with _connection_lock:
+                if not _connection:
+                    self._open_connection()
+                    if self.is_connected():
+                        _connection.update(client=self.client, spreadsheet=self.spreadsheet)
+                self.client = _connection.get('client')
+                self.spreadsheet = _connection.get('spreadsheet')
+        
+        except Exception as e:
+            st.error(f"Failed to connect to Google Sheets: {str(e)}")
+            self.client = None
+            self.spreadsheet = None
+    
+    def _connect_client(self, client):
+        """Use the given client instead of the shared connection"""
         try:
-            # Get credentials from Streamlit secrets
-            if "google_sheets" in st.secrets:
-                creds_dict = dict(st.secrets["google_sheets"])
-                credentials = Credentials.from_service_account_info(
-                    creds_dict,
-                    scopes=[
-                        "https://www.googleapis.com/auth/spreadsheets",
-                        "https://www.googleapis.com/auth/drive"
-                    ]
-                )
-                self.client = gspread.authorize(credentials)
-                
-                # Get or create spreadsheet
-                spreadsheet_url = st.secrets.get("spreadsheet_url", "")
-                if spreadsheet_url:
-                    self.spreadsheet = self.client.open_by_url(spreadsheet_url)
-                else:
-                    # Create new spreadsheet
-                    self.spreadsheet = self.client.create("Fitness Tracker Data")
-                    st.info(f"Created new spreadsheet: {self.spreadsheet.url}")
-                    
+            self._open_spreadsheet(client)
         except Exception as e:
             st.error(f"Failed to connect to Google Sheets: {str(e)}")
             self.client = None
             self.spreadsheet = None
     
+    def _open_connection(self):
+        """Connect to Google Sheets using service account credentials"""
+        # Get credentials from Streamlit secrets
+        if "google_sheets" in st.secrets:
+            creds_dict = dict(st.secrets["google_sheets"])
+            credentials = Credentials.from_service_account_info(
+                creds_dict,
+                scopes=[
+                    "https://www.googleapis.com/auth/spreadsheets",
+                    "https://www.googleapis.com/auth/drive"
+                ]
+            )
+            self._open_spreadsheet(gspread.authorize(credentials))
+    
+    def _open_spreadsheet(self, client):
+        """Open the configured spreadsheet with a client, creating one if no URL is set"""
+        self.client = client
+        
+        # Get or create spreadsheet
+        spreadsheet_url = _secret("spreadsheet_url", "")
+        if spreadsheet_url:
+            self.spreadsheet = gateway.read(self.client.open_by_url, spreadsheet_url)
+        else:
+            # Create new spreadsheet
+            self.spreadsheet = gateway.write(self.client.create, "Fitness Tracker Data")
+            st.info(f"Created new spreadsheet: {self.spreadsheet.url}")
+    
     def is_connected(self):
         """Check if successfully connected to Google Sheets"""
         return self.client is not None and self.spreadsheet is not None
     
+    def _worksheet_missing(self, sheet_name):
+        """Whether a load found no such worksheet within the cache TTL; only batched loads go by this"""
+        with _connection_lock:
+            missing_since = _missing_worksheets.get((self.spreadsheet.id, sheet_name))
+        return missing_since is not None and time.monotonic() - missing_since < self.cache_ttl
+    
+    def _forget_missing(self, sheet_name):
+        """Drop a worksheet's "missing" mark, e.g. because it is being written to"""
+        with _connection_lock:
+            _missing_worksheets.pop((self.spreadsheet.id, sheet_name), None)
+    
+    def _worksheet(self, sheet_name):
+        """Worksheet handle, looked up by title only once per process"""
+        key = (self.spreadsheet.id, sheet_name)
+        with _connection_lock:
+            worksheet = _worksheets.get(key)
+        if worksheet is None:
+            worksheet = gateway.read(self.spreadsheet.worksheet, sheet_name)
+            with _connection_lock:
+                _worksheets[key] = worksheet
+                _missing_worksheets.pop(key, None)
+        return worksheet
+    
+    def _forget_worksheet(self, sheet_name):
+        """Drop a cached worksheet handle after a call on it failed, e.g. because it was deleted"""
+        with _connection_lock:
+            _worksheets.pop((self.spreadsheet.id, sheet_name), None)
+    
     def _get_or_create_worksheet(self, sheet_name, headers):
         """Get existing worksheet or create new one with headers"""
+        self._forget_missing(sheet_name)
         try:
-            worksheet = self.spreadsheet.worksheet(sheet_name)
+            worksheet = self._worksheet(sheet_name)
         except gspread.WorksheetNotFound:
-            worksheet = self.spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=len(headers))
-            worksheet.append_row(headers)
+            try:
+                worksheet = gateway.write(self.spreadsheet.add_worksheet, title=sheet_name, rows=1000, cols=len(headers))
+            except gspread.exceptions.APIError as e:
+                if 'already exists' not in str(e):
+                    raise
+                # Another process created it since the lookup
+                return self._worksheet(sheet_name)
+            gateway.write(worksheet.append_row, headers)
+            with _connection_lock:
+                _worksheets[(self.spreadsheet.id, sheet_name)] = worksheet
         
         return worksheet
     
-    def save_body_metrics(self, data):
-        """Save body metrics data to Google Sheets"""
-        if not self.is_connected():
-            return False
-        
+    def _row_values(self, table, data):
+        """Convert a record to a worksheet row in column order; missing values become blank cells"""
+        values = []
+        for col in TABLE_COLUMNS[table]:
+            value = data.get(col)
+            values.append('' if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)) else str(value))
+        return values
+    
+    def _write_buffer(self, table):
+        """Shared write buffer for a worksheet"""
+        key = (self.spreadsheet.id, table)
+        worksheet = self._get_or_create_worksheet(table, TABLE_COLUMNS[table])
+        with _write_buffers_lock:
+            buffer = _write_buffers.get(key)
+            if buffer is None:
+                buffer = WorksheetWriteBuffer(key, worksheet, self.write_batch_rows, self.write_batch_seconds)
+                _write_buffers[key] = buffer
+            # Follow reconnects so pending rows go out on the current client
+            buffer.worksheet = worksheet
+        return buffer
+    
+    def _flush_pending(self, table):
+        """Write a worksheet's buffered rows so a load sees every save"""
+        with _write_buffers_lock:
+            buffer = _write_buffers.get((self.spreadsheet.id, table))
+        if buffer is not None:
+            buffer.flush()
+    
+    def _record_key(self, table, data):
+        """Key of a record (date, or date and day) in the form the row index uses"""
+        return tuple(
+            pd.Timestamp(data.get(col)).strftime(DATE_FORMAT) if col == 'date' else str(data.get(col))
+            for col in TABLE_KEYS[table]
+        )
+    
+    def _key_rows(self, table):
+        """
+        Map each key to the worksheet row holding it, built lazily from the
+        cached worksheet and rebuilt whenever the cache picks up new rows
+        """
         try:
-            headers = ['date', 'week', 'weight', 'fat_percentage', 'muscle_mass', 
-                      'chest', 'waist', 'hips', 'arms', 'thighs', 'notes']
-            worksheet = self._get_or_create_worksheet('body_metrics', headers)
-            
-            # Convert data to list format
-            row_data = [
-                str(data.get('date', '')),
-                str(data.get('week', '')),
-                str(data.get('weight', '')),
-                str(data.get('fat_percentage', '')),
-                str(data.get('muscle_mass', '')),
-                str(data.get('chest', '')),
-                str(data.get('waist', '')),
-                str(data.get('hips', '')),
-                str(data.get('arms', '')),
-                str(data.get('thighs', '')),
-                str(data.get('notes', ''))
-            ]
-            
-            worksheet.append_row(row_data)
+            entry = self._cached_entry(table)
+        except gspread.WorksheetNotFound:
+            return {}
+        if entry is None:
+            return {}
+        
+        if 'key_rows' not in entry:
+            # Physical rows, before duplicates were settled
+            frame = entry['rows']
+            keys = TABLE_KEYS[table]
+            key_rows = {}
+            if all(col in frame.columns for col in keys):
+                parts = [
+                    frame[col].dt.strftime(DATE_FORMAT) if col == 'date' else frame[col].astype(str)
+                    for col in keys
+                ]
+                # Row 1 is the header; a duplicated key maps to its last row, the one reads keep
+                for row, key in enumerate(zip(*parts), start=2):
+                    if not pd.isna(key[0]):
+                        key_rows[key] = row
+            with _read_cache_lock:
+                entry['key_rows'] = key_rows
+        return entry['key_rows']
+    
+    def _cell_key(self, table, cells):
+        """Key of a worksheet row from its raw cell values, in the form the row index uses"""
+        key = []
+        for col in TABLE_KEYS[table]:
+            position = TABLE_COLUMNS[table].index(col)
+            value = _cell_text(cells[position]) if position < len(cells) else ''
+            if col == 'date':
+                value = parse_dates(pd.Series([value])).dt.strftime(DATE_FORMAT).iloc[0]
+            key.append(value)
+        return tuple(key)
+    
+    def _rows_hold_keys(self, table, targets):
+        """
+        Whether each worksheet row in targets ({key: row}) still holds its key,
+        checked by reading the rows' key cells in one values_batch_get
+        """
+        if not targets:
             return True
-            
-        except Exception as e:
-            st.error(f"Failed to save body metrics: {str(e)}")
-            return False
+        last_column = chr(ord('A') + max(TABLE_COLUMNS[table].index(col) for col in TABLE_KEYS[table]))
+        ranges = [f"'{table}'!A{row}:{last_column}{row}" for row in targets.values()]
+        for key, values in zip(targets, self._get_values(ranges)):
+            if self._cell_key(table, values[0] if values else []) != key:
+                return False
+        return True
     
-    def save_workout_data(self, data):
-        """Save workout data to Google Sheets"""
+    def _upsert(self, table, records, buffered):
+        """
+        Overwrite the rows of keys already in the worksheet with one
+        batch_update and append the rest, through the write buffer if asked
+        """
+        rows = {}
+        for data in records:
+            # Within one call the last record for a key wins
+            rows[self._record_key(table, data)] = self._row_values(table, data)
+        
+        key_rows = self._key_rows(table)
+        if not self._rows_hold_keys(table, {key: key_rows[key] for key in rows if key in key_rows}):
+            # Rows were deleted, sorted or inserted since the index was built: rebuild it from a full download
+            _invalidate_read_cache((self.spreadsheet.id, table))
+            key_rows = self._key_rows(table)
+        updates = [(key_rows[key], values) for key, values in rows.items() if key in key_rows]
+        new_rows = [(key, values) for key, values in rows.items() if key not in key_rows]
+        buffer = self._write_buffer(table)
+        
+        if updates:
+            last_column = chr(ord('A') + len(TABLE_COLUMNS[table]) - 1)
+            gateway.write(buffer.worksheet.batch_update, [
+                {'range': f"A{row}:{last_column}{row}", 'values': [values]} for row, values in updates
+            ])
+            # A delta sync only sees appended rows, so reload the worksheet in full next time
+            _invalidate_read_cache(buffer.key)
+        
+        if buffered:
+            buffer.add([values for _, values in new_rows], [key for key, _ in new_rows])
+            return True
+        
+        with buffer.lock:
+            # Rows already buffered were saved first, so they go first
+            if not buffer.flush():
+                return False
+            if new_rows:
+                gateway.write(buffer.worksheet.append_rows, [values for _, values in new_rows])
+                _expire_read_cache(buffer.key)
+        return True
+    
+    def _append_records(self, table, records, label):
+        """Upsert records, queueing new ones for the worksheet's next batched append"""
         if not self.is_connected():
             return False
         
         try:
-            headers = ['date', 'week', 'day', 'workout_type', 'completed', 
-                      'exercises_completed', 'total_exercises', 'duration_minutes', 
-                      'intensity_rating', 'notes']
-            worksheet = self._get_or_create_worksheet('workout_data', headers)
-            
-            row_data = [
-                str(data.get('date', '')),
-                str(data.get('week', '')),
-                str(data.get('day', '')),
-                str(data.get('workout_type', '')),
-                str(data.get('completed', '')),
-                str(data.get('exercises_completed', '')),
-                str(data.get('total_exercises', '')),
-                str(data.get('duration_minutes', '')),
-                str(data.get('intensity_rating', '')),
-                str(data.get('notes', ''))
-            ]
-            
-            worksheet.append_row(row_data)
-            return True
+            return self._upsert(table, records, buffered=True)
             
         except Exception as e:
-            st.error(f"Failed to save workout data: {str(e)}")
+            st.error(f"Failed to save {label}: {str(e)}")
             return False
     
+    def save_body_metrics(self, data):
+        """Save body metrics data to Google Sheets"""
+        return self._append_records('body_metrics', [data], 'body metrics')
+    
+    def save_workout_data(self, data):
+        """Save workout data to Google Sheets"""
+        return self._append_records('workout_data', [data], 'workout data')
+    
     def save_diet_data(self, data):
         """Save diet data to Google Sheets"""
+        return self._append_records('diet_data', [data], 'diet data')
+    
+    def save_batch(self, table, records):
+        """Save many records of one table to Google Sheets right away: one update and one append request at most"""
         if not self.is_connected():
             return False
         
         try:
-            headers = ['date', 'week', 'day', 'adherence_score', 'calories_estimated',
-                      'meals_followed', 'total_planned_meals', 'notes']
-            worksheet = self._get_or_create_worksheet('diet_data', headers)
-            
-            row_data = [
-                str(data.get('date', '')),
-                str(data.get('week', '')),
-                str(data.get('day', '')),
-                str(data.get('adherence_score', '')),
-                str(data.get('calories_estimated', '')),
-                str(data.get('meals_followed', '')),
-                str(data.get('total_planned_meals', '')),
-                str(data.get('notes', ''))
-            ]
-            
-            worksheet.append_row(row_data)
-            return True
+            return self._upsert(table, records, buffered=False)
             
         except Exception as e:
-            st.error(f"Failed to save diet data: {str(e)}")
+            st.error(f"Failed to save {table.replace('_', ' ')}: {str(e)}")
             return False
     
-    def load_body_metrics(self):
-        """Load body metrics data from Google Sheets"""
-        if not self.is_connected():
-            return pd.DataFrame()
-        
+    def _revision(self):
+        """Spreadsheet's last update time: one small Drive call instead of a sheet download"""
         try:
-            worksheet = self.spreadsheet.worksheet('body_metrics')
-            data = worksheet.get_all_records()
-            df = pd.DataFrame(data)
-            
-            if not df.empty:
-                # Convert numeric columns
-                numeric_cols = ['weight', 'fat_percentage', 'muscle_mass', 
-                               'chest', 'waist', 'hips', 'arms', 'thighs']
-                for col in numeric_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Convert date column
-                df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            
-            return df
-            
-        except gspread.WorksheetNotFound:
-            return pd.DataFrame()
-        except Exception as e:
-            st.error(f"Failed to load body metrics: {str(e)}")
-            return pd.DataFrame()
+            return gateway.read(self.spreadsheet.get_lastUpdateTime)
+        except Exception:
+            return None
+    
+    def _frame_from_values(self, table, header, rows):
+        """Typed frame from raw worksheet rows, built column by column without per-row objects"""
+        width = len(header)
+        rows = [row[:width] if len(row) >= width else list(row) + [''] * (width - len(row)) for row in rows]
+        columns = list(zip(*rows)) if rows else [()] * width
+        schema = TABLE_SCHEMAS[table]
+        
+        data = {}
+        for name, values in zip(header, columns):
+            if name in schema:
+                data[name] = _typed_column(values, schema[name])
+            else:
+                data[name] = _typed_column(values, 'object')
+        # Already in schema dtypes, so this only guards against odd headers
+        return apply_schema(pd.DataFrame(data, columns=header), table)
+    
+    def _get_values(self, ranges):
+        """Raw values of several A1 ranges, fetched with one values_batch_get request"""
+        response = gateway.read(self.spreadsheet.values_batch_get, ranges, params=VALUE_RENDER_PARAMS)
+        return [value_range.get('values', []) for value_range in response.get('valueRanges', [])]
+    
+    def _full_sync(self, table):
+        """Download a whole worksheet"""
+        # Looking the worksheet up first raises WorksheetNotFound for missing sheets
+        self._worksheet(table)
+        revision = self._revision()
+        return self._full_entry(table, self._get_values([f"'{table}'"])[0], revision)
+    
+    def _settle(self, table, rows):
+        """One row per key, the last one written winning, as the local backends return"""
+        if rows.empty or not all(col in rows.columns for col in TABLE_KEYS[table]):
+            return rows
+        return settle_frame(rows, table)[0]
+    
+    def _full_entry(self, table, values, revision):
+        """Cache entry for a worksheet's complete values"""
+        if not values:
+            return None
+        
+        now = time.monotonic()
+        rows = self._frame_from_values(table, values[0], values[1:])
+        return {
+            'checked': now,
+            'synced': now,
+            'revision': revision,
+            'rows': rows,
+            'frame': self._settle(table, rows),
+            'header': values[0],
+            'last_row': len(values),
+            'anchor': _trim(values[-1])
+        }
+    
+    def _delta_sync(self, table, entry, revision):
+        """
+        Fetch only the rows after the last one seen. The range starts at that
+        row; if it no longer matches, or the spreadsheet changed without new
+        rows, rows above it changed and the worksheet is downloaded in full instead.
+        """
+        self._worksheet(table)
+        values = self._get_values([f"'{table}'!{self._delta_range(entry)}"])[0]
+        return self._delta_entry(table, entry, values, revision) or self._full_sync(table)
+    
+    def _delta_range(self, entry):
+        """A1 range from the last row seen to the end of the worksheet"""
+        last_column = chr(ord('A') + len(entry['header']) - 1)
+        return f"A{entry['last_row']}:{last_column}"
+    
+    def _delta_entry(self, table, entry, values, revision):
+        """Extend a cache entry with the rows after its anchor, or None if existing rows may have changed"""
+        if not values or _trim(values[0]) != entry['anchor']:
+            return None
+        
+        rows, frame = entry['rows'], entry['frame']
+        new_rows = values[1:]
+        if not new_rows and revision is not None:
+            # The spreadsheet changed but nothing was appended here, so a row may have been edited in place
+            return None
+        if new_rows:
+            rows = self._frame_from_values(table, entry['header'], new_rows)
+            # Categories differ between the two parts, so re-apply the schema after joining them
+            rows = apply_schema(pd.concat([entry['rows'], rows], ignore_index=True), table)
+            frame = self._settle(table, rows)
+        
+        entry = dict(
+            entry,
+            checked=time.monotonic(),
+            revision=revision,
+            rows=rows,
+            frame=frame,
+            last_row=entry['last_row'] + len(new_rows),
+            anchor=_trim(values[-1])
+        )
+        if new_rows:
+            # The key index is rebuilt on next use
+            entry.pop('key_rows', None)
+        return entry
+    
+    def _cached_entry(self, table):
+        """A worksheet's read cache entry, brought up to date if its TTL expired"""
+        key = (self.spreadsheet.id, table)
+        with _read_cache_lock:
+            entry = _read_cache.get(key)
+        
+        now = time.monotonic()
+        if entry is None or now - entry['synced'] >= self.full_sync_seconds:
+            entry = self._full_sync(table)
+        elif now - entry['checked'] >= self.cache_ttl:
+            # After the TTL, fetch new rows only if the spreadsheet changed since
+            revision = self._revision()
+            if revision is not None and revision == entry['revision']:
+                entry = dict(entry, checked=now)
+            else:
+                entry = self._delta_sync(table, entry, revision)
+        
+        if entry is not None:
+            with _read_cache_lock:
+                _read_cache[key] = entry
+        return entry
     
-    def load_workout_data(self):
-        """Load workout data from Google Sheets"""
+    def _load_table(self, table, label, start=None, end=None, columns=None):
+        """Load a worksheet through the shared read cache, fetching only rows added since the last load"""
         if not self.is_connected():
-            return pd.DataFrame()
+            return empty_frame(table, columns)
         
         try:
-            worksheet = self.spreadsheet.worksheet('workout_data')
-            data = worksheet.get_all_records()
-            df = pd.DataFrame(data)
+            self._flush_pending(table)
+            entry = self._cached_entry(table)
+            if entry is None:
+                return empty_frame(table, columns)
             
-            if not df.empty:
-                # Convert numeric columns
-                numeric_cols = ['exercises_completed', 'total_exercises', 
-                               'duration_minutes', 'intensity_rating']
-                for col in numeric_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Convert boolean columns
-                if 'completed' in df.columns:
-                    df['completed'] = df['completed'].astype(str).str.lower() == 'true'
-                
-                # Convert date column
-                df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            
-            return df
+            # The cached frame is shared between sessions, so callers get a copy
+            frame = filter_frame(entry['frame'], start, end, columns)
+            return _cache_copy(frame) if frame is entry['frame'] else frame
             
         except gspread.WorksheetNotFound:
-            return pd.DataFrame()
+            # Batched loads leave it out until the cache TTL passes or it is written to
+            with _connection_lock:
+                _missing_worksheets[(self.spreadsheet.id, table)] = time.monotonic()
+            return empty_frame(table, columns)
         except Exception as e:
-            st.error(f"Failed to load workout data: {str(e)}")
-            return pd.DataFrame()
+            self._forget_worksheet(table)
+            st.error(f"Failed to load {label}: {str(e)}")
+            return empty_frame(table, columns)
     
-    def load_diet_data(self):
-        """Load diet data from Google Sheets"""
+    def load_all(self, start=None, end=None):
+        """
+        Load body metrics, workout and diet data together. Whatever the cache
+        can't answer is fetched with a single values_batch_get request.
+        """
+        tables = list(TABLE_COLUMNS)
         if not self.is_connected():
-            return pd.DataFrame()
+            return tuple(empty_frame(table) for table in tables)
         
         try:
-            worksheet = self.spreadsheet.worksheet('diet_data')
-            data = worksheet.get_all_records()
-            df = pd.DataFrame(data)
-            
-            if not df.empty:
-                # Convert numeric columns
-                numeric_cols = ['adherence_score', 'calories_estimated', 
-                               'meals_followed', 'total_planned_meals']
-                for col in numeric_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Convert date column
-                df['date'] = pd.to_datetime(df['date'], errors='coerce')
+            now = time.monotonic()
+            due = {}
+            for table in tables:
+                self._flush_pending(table)
+                if self._worksheet_missing(table):
+                    # It would fail the whole batch; the per-worksheet load returns it empty
+                    continue
+                with _read_cache_lock:
+                    entry = _read_cache.get((self.spreadsheet.id, table))
+                if entry is None or now - entry['synced'] >= self.full_sync_seconds:
+                    due[table] = None
+                elif now - entry['checked'] >= self.cache_ttl:
+                    due[table] = entry
             
-            return df
+            if due:
+                # One revision probe covers every worksheet
+                revision = self._revision()
+                for table, entry in list(due.items()):
+                    if entry is not None and revision is not None and revision == entry['revision']:
+                        with _read_cache_lock:
+                            _read_cache[(self.spreadsheet.id, table)] = dict(entry, checked=now)
+                        del due[table]
             
-        except gspread.WorksheetNotFound:
-            return pd.DataFrame()
+            if due:
+                ranges = [
+                    f"'{table}'" if entry is None else f"'{table}'!{self._delta_range(entry)}"
+                    for table, entry in due.items()
+                ]
+                for (table, entry), values in zip(due.items(), self._get_values(ranges)):
+                    if entry is None:
+                        new_entry = self._full_entry(table, values, revision)
+                    else:
+                        new_entry = self._delta_entry(table, entry, values, revision) or self._full_sync(table)
+                    if new_entry is not None:
+                        with _read_cache_lock:
+                            _read_cache[(self.spreadsheet.id, table)] = new_entry
         except Exception as e:
-            st.error(f"Failed to load diet data: {str(e)}")
-            return pd.DataFrame()
+            # e.g. a worksheet that doesn't exist yet fails the whole batch;
+            # the per-worksheet loads below cope with that
+            print(f"Batched Google Sheets load failed, loading worksheets one by one: {e}")
+        
+        return tuple(
+            empty_frame(table) if self._worksheet_missing(table) else self._load_table(table, table.replace('_', ' '), start, end)
+            for table in tables
+        )
+    
+    def load_body_metrics(self, start=None, end=None, columns=None):
+        """Load body metrics data from Google Sheets, optionally limited to a date range and columns"""
+        return self._load_table('body_metrics', 'body metrics', start, end, columns)
+    
+    def load_workout_data(self, start=None, end=None, columns=None):
+        """Load workout data from Google Sheets, optionally limited to a date range and columns"""
+        return self._load_table('workout_data', 'workout data', start, end, columns)
+    
+    def load_diet_data(self, start=None, end=None, columns=None):
+        """Load diet data from Google Sheets, optionally limited to a date range and columns"""
+        return self._load_table('diet_data', 'diet data', start, end, columns)
     
     def reset_all_data(self):
         """Clear all data from Google Sheets"""
@@ -246,11 +705,19 @@ class SheetsManager:
             sheet_names = ['body_metrics', 'workout_data', 'diet_data']
             
             for sheet_name in sheet_names:
+                with _write_buffers_lock:
+                    buffer = _write_buffers.get((self.spreadsheet.id, sheet_name))
+                if buffer is not None:
+                    buffer.discard()
                 try:
-                    worksheet = self.spreadsheet.worksheet(sheet_name)
+                    # gspread raises a handle's row_count locally on every append, even when
+                    # the grid doesn't grow, so look the worksheet up again for its real size
+                    self._forget_worksheet(sheet_name)
+                    worksheet = self._worksheet(sheet_name)
                     # Clear all data except headers
                     if worksheet.row_count > 1:
-                        worksheet.delete_rows(2, worksheet.row_count)
+                        gateway.write(worksheet.delete_rows, 2, worksheet.row_count)
+                    _invalidate_read_cache((self.spreadsheet.id, sheet_name))
                 except gspread.WorksheetNotFound:
                     continue  # Sheet doesn't exist, skip
             
@@ -266,11 +733,12 @@ class SheetsManager:
             return None
         
         try:
-            worksheets = self.spreadsheet.worksheets()
+            worksheets = gateway.read(self.spreadsheet.worksheets)
             info = {
                 'title': self.spreadsheet.title,
                 'url': self.spreadsheet.url,
-                'worksheets': []
+                'worksheets': [],
+                'api_metrics': gateway.get_metrics()
             }
             
             for ws in worksheets:
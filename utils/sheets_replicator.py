@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+from utils.data_manager import _atomic_write, _exclusive_lock
+from utils.schemas import TABLE_COLUMNS, TABLE_KEYS, parse_dates, empty_frame
+
+class Outbox:
+    """Records saved locally but not yet pushed to Google Sheets, kept in a JSON-lines file"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.lock")
+    
+    def append(self, table, records):
+        """Queue records for the next push"""
+        data = "".join(
+            json.dumps({'table': table, 'record': record}, default=str) + "\n" for record in records
+        ).encode('utf-8')
+        with _exclusive_lock(self.lock_path):
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def read(self):
+        """Every queued entry, oldest first"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            lines = f.read().splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+    
+    def remove(self, count, done):
+        """Drop the entries at positions `done` out of the first `count`; later appends are kept"""
+        with _exclusive_lock(self.lock_path):
+            entries = self.read()
+            remaining = [entry for i, entry in enumerate(entries) if i >= count or i not in done]
+            data = "".join(json.dumps(entry, default=str) + "\n" for entry in remaining)
+            _atomic_write(self.path, lambda tmp_path: self._write_text(tmp_path, data))
+    
+    def clear(self):
+        """Forget every queued entry"""
+        with _exclusive_lock(self.lock_path):
+            if os.path.exists(self.path):
+                os.remove(self.path)
+    
+    def _write_text(self, path, data):
+        """Write text to a file"""
+        with open(path, 'w') as f:
+            f.write(data)
+
+def _comparable(df, columns):
+    """Frame with plain values so local and remote rows compare cell by cell"""
+    df = df[columns].copy()
+    for col in columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            df[col] = df[col].astype(object).replace('', None)
+    return df
+
+def changed_rows(remote, local, table, pending_keys=()):
+    """
+    Remote rows that are new or differ from the local copy. The last row for
+    a key wins, and keys with local changes still waiting to be pushed are
+    skipped: on a conflict the local edit wins.
+    """
+    keys = TABLE_KEYS[table]
+    columns = [col for col in TABLE_COLUMNS[table] if col in remote.columns and col in local.columns]
+    if remote.empty or any(key not in columns for key in keys):
+        return remote.iloc[0:0]
+    
+    remote = _comparable(remote.dropna(subset=['date']), columns).drop_duplicates(keys, keep='last')
+    local = _comparable(local, columns).drop_duplicates(keys, keep='last')
+    merged = remote.merge(local, on=keys, how='left', suffixes=('', '_local'), indicator=True)
+    
+    changed = merged['_merge'] == 'left_only'
+    for col in columns:
+        if col in keys:
+            continue
+        ours, theirs = merged[col], merged[f"{col}_local"]
+        same = (ours == theirs).fillna(False).astype(bool) | (ours.isna() & theirs.isna())
+        changed |= ~same
+    
+    if pending_keys:
+        pending = merged[keys].apply(tuple, axis=1).isin(set(pending_keys))
+        changed &= ~pending
+    
+    return merged.loc[changed, columns]
+
+class SheetsReplicator:
+    """
+    Background thread mirroring the local store to Google Sheets: pushes
+    queued local saves in batches and periodically pulls remote edits
+    """
+    
+    def __init__(self, local_manager, sheets_manager, outbox, push_seconds=5.0, pull_seconds=60.0):
+        self.local_manager = local_manager
+        self.sheets_manager = sheets_manager
+        self.outbox = outbox
+        self.push_seconds = push_seconds
+        self.pull_seconds = pull_seconds
+        self.lock = threading.Lock()
+        self.last_push = None
+        self.last_pull = None
+        self.last_error = None
+        self.thread = threading.Thread(target=self._run, name="sheets-replicator", daemon=True)
+    
+    def start(self):
+        """Start replicating; the first pass pulls so an empty local store fills up"""
+        self.thread.start()
+    
+    def _run(self):
+        """Replication loop; saves made between passes go out together"""
+        next_pull = 0.0
+        while True:
+            pull = time.monotonic() >= next_pull
+            if pull:
+                next_pull = time.monotonic() + self.pull_seconds
+            self.sync(pull)
+            time.sleep(self.push_seconds)
+    
+    def sync(self, pull=True):
+        """Push queued local changes, then optionally pull remote edits"""
+        with self.lock:
+            try:
+                self.push()
+                if pull:
+                    self.pull()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error replicating to Google Sheets: {e}")
+    
+    def push(self):
+        """Send queued records to Google Sheets, one request per table"""
+        entries = self.outbox.read()
+        if not entries:
+            return
+        
+        done = set()
+        for table in TABLE_COLUMNS:
+            positions = [i for i, entry in enumerate(entries) if entry['table'] == table]
+            if positions and self.sheets_manager.save_batch(table, [entries[i]['record'] for i in positions]):
+                done.update(positions)
+        
+        self.outbox.remove(len(entries), done)
+        self.last_push = datetime.now()
+    
+    def pull(self):
+        """Copy rows that were added or edited in Google Sheets into the local store"""
+        pending = self._pending_keys()
+        for table in TABLE_COLUMNS:
+            remote = getattr(self.sheets_manager, f"load_{table}")()
+            if remote.empty:
+                continue
+            local = getattr(self.local_manager, f"load_{table}")()
+            if local.empty:
+                local = empty_frame(table)
+            
+            updates = changed_rows(remote, local, table, pending.get(table, ()))
+            if not updates.empty:
+                self.local_manager.save_batch(table, updates.to_dict('records'))
+        self.last_pull = datetime.now()
+    
+    def _pending_keys(self):
+        """Keys of queued local changes per table, as comparable tuples"""
+        pending = {}
+        for entry in self.outbox.read():
+            record = entry['record']
+            date = parse_dates(pd.Series([record.get('date')])).iloc[0]
+            key = tuple(date if col == 'date' else record.get(col) for col in TABLE_KEYS[entry['table']])
+            pending.setdefault(entry['table'], set()).add(key)
+        return pending
+    
+    def status(self):
+        """Replication state for the storage panel"""
+        return {
+            'pending_changes': len(self.outbox.read()),
+            'last_push': self.last_push,
+            'last_pull': self.last_pull,
+            'last_error': self.last_error
+        }
+
+# One replicator per server process, shared by every session
+_replicator = None
+_replicator_lock = threading.Lock()
+
+def get_replicator(local_manager, sheets_manager, outbox_path, push_seconds=5.0, pull_seconds=60.0):
+    """Return the process's replicator, starting it on first use"""
+    global _replicator
+    with _replicator_lock:
+        if _replicator is None:
+            _replicator = SheetsReplicator(local_manager, sheets_manager, Outbox(outbox_path), push_seconds, pull_seconds)
+            _replicator.start()
+        return _replicator
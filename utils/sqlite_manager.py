@@ -0,0 +1,276 @@
+import sqlite3
+import os
+from contextlib import closing
+import pandas as pd
+from utils.data_manager import build_weekly_summary
+from utils.schemas import TABLE_COLUMNS, TABLE_KEYS, DATE_FORMAT, apply_schema
+
+# SQLite column types; anything not listed is stored as TEXT
+COLUMN_TYPES = {
+    'weight': 'REAL',
+    'fat_percentage': 'REAL',
+    'muscle_mass': 'REAL',
+    'chest': 'REAL',
+    'waist': 'REAL',
+    'hips': 'REAL',
+    'arms': 'REAL',
+    'thighs': 'REAL',
+    'completed': 'INTEGER',
+    'exercises_completed': 'INTEGER',
+    'total_exercises': 'INTEGER',
+    'duration_minutes': 'INTEGER',
+    'intensity_rating': 'INTEGER',
+    'adherence_score': 'INTEGER',
+    'calories_estimated': 'INTEGER',
+    'meals_followed': 'INTEGER',
+    'total_planned_meals': 'INTEGER'
+}
+
+class SQLiteManager:
+    """
+    Local SQLite storage with keyed upserts and indexes on date and week,
+    exposing the same load/save API as DataManager
+    """
+    
+    def __init__(self, db_path=None):
+        self.data_dir = "data"
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        
+        self.db_path = db_path or os.path.join(self.data_dir, "fitness_tracker.db")
+        self.initialize_database()
+    
+    def _connect(self):
+        """Open a connection; one per call keeps the manager safe across Streamlit threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+    
+    def initialize_database(self):
+        """Create tables and indexes if they don't exist"""
+        with closing(self._connect()) as conn, conn:
+            # WAL lets other sessions keep reading while one writes
+            conn.execute("PRAGMA journal_mode = WAL")
+            for table, columns in TABLE_COLUMNS.items():
+                column_defs = ", ".join(f"{col} {COLUMN_TYPES.get(col, 'TEXT')}" for col in columns)
+                primary_key = ", ".join(TABLE_KEYS[table])
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ({column_defs}, PRIMARY KEY ({primary_key}))"
+                )
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_week ON {table} (week)")
+    
+    def _upsert(self, table, rows):
+        """Insert rows in one transaction, replacing the non-key columns of existing entries"""
+        columns = TABLE_COLUMNS[table]
+        keys = TABLE_KEYS[table]
+        updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col not in keys)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+        )
+        params = [[self._to_sql_value(col, row.get(col)) for col in columns] for row in rows]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(sql, params)
+    
+    def _to_sql_value(self, column, value):
+        """Convert a Python value to what SQLite should store"""
+        if value is None or pd.isna(value):
+            return None
+        if column == 'date':
+            return pd.Timestamp(value).strftime(DATE_FORMAT)
+        if column == 'completed':
+            return int(bool(value))
+        # numpy scalars (e.g. from an imported frame) are not understood by sqlite3
+        return value.item() if hasattr(value, 'item') else value
+    
+    def _load_table(self, table, start=None, end=None, columns=None, week=None):
+        """Read a table, optionally restricted to a date range or week using the indexes"""
+        clauses = []
+        params = []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start).strftime(DATE_FORMAT))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end).strftime(DATE_FORMAT))
+        if week is not None:
+            clauses.append("week = ?")
+            params.append(week)
+        
+        selected = TABLE_COLUMNS[table] if columns is None else [col for col in TABLE_COLUMNS[table] if col in columns]
+        sql = f"SELECT {', '.join(selected)} FROM {table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        # rowid survives ON CONFLICT updates, so this is first-write order like the CSV files
+        sql += " ORDER BY rowid"
+        
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(sql, conn, params=params)
+        
+        return apply_schema(df, table)
+    
+    def load_body_metrics(self, start=None, end=None, columns=None, week=None):
+        """Load body metrics data, optionally limited to a date range, week and subset of columns"""
+        try:
+            return self._load_table('body_metrics', start, end, columns, week)
+        except Exception as e:
+            print(f"Error loading body metrics: {e}")
+            return pd.DataFrame()
+    
+    def load_workout_data(self, start=None, end=None, columns=None, week=None):
+        """Load workout data, optionally limited to a date range, week and subset of columns"""
+        try:
+            return self._load_table('workout_data', start, end, columns, week)
+        except Exception as e:
+            print(f"Error loading workout data: {e}")
+            return pd.DataFrame()
+    
+    def load_diet_data(self, start=None, end=None, columns=None, week=None):
+        """Load diet data, optionally limited to a date range, week and subset of columns"""
+        try:
+            return self._load_table('diet_data', start, end, columns, week)
+        except Exception as e:
+            print(f"Error loading diet data: {e}")
+            return pd.DataFrame()
+    
+    def load_all(self, start=None, end=None):
+        """Load body metrics, workout and diet data together"""
+        return (
+            self.load_body_metrics(start, end),
+            self.load_workout_data(start, end),
+            self.load_diet_data(start, end)
+        )
+    
+    def save_body_metrics(self, date, weight, fat_percentage, muscle_mass=None,
+                         chest=None, waist=None, hips=None, arms=None, thighs=None, notes=""):
+        """Save body metrics data"""
+        try:
+            self._upsert('body_metrics', [{
+                'date': date,
+                'week': date.strftime("%Y-W%U"),
+                'weight': weight,
+                'fat_percentage': fat_percentage,
+                'muscle_mass': muscle_mass,
+                'chest': chest,
+                'waist': waist,
+                'hips': hips,
+                'arms': arms,
+                'thighs': thighs,
+                'notes': notes
+            }])
+            return True
+        except Exception as e:
+            print(f"Error saving body metrics: {e}")
+            return False
+    
+    def save_workout_data(self, date, day, workout_type, completed, exercises_completed,
+                         total_exercises, duration_minutes=None, intensity_rating=None, notes=""):
+        """Save workout data"""
+        try:
+            self._upsert('workout_data', [{
+                'date': date,
+                'week': date.strftime("%Y-W%U"),
+                'day': day,
+                'workout_type': workout_type,
+                'completed': completed,
+                'exercises_completed': exercises_completed,
+                'total_exercises': total_exercises,
+                'duration_minutes': duration_minutes,
+                'intensity_rating': intensity_rating,
+                'notes': notes
+            }])
+            return True
+        except Exception as e:
+            print(f"Error saving workout data: {e}")
+            return False
+    
+    def save_diet_data(self, date, day, adherence_score, calories_estimated=None,
+                      meals_followed=None, total_planned_meals=None, notes=""):
+        """Save diet data"""
+        try:
+            self._upsert('diet_data', [{
+                'date': date,
+                'week': date.strftime("%Y-W%U"),
+                'day': day,
+                'adherence_score': adherence_score,
+                'calories_estimated': calories_estimated,
+                'meals_followed': meals_followed,
+                'total_planned_meals': total_planned_meals,
+                'notes': notes
+            }])
+            return True
+        except Exception as e:
+            print(f"Error saving diet data: {e}")
+            return False
+    
+    def save_batch(self, table, records):
+        """Save many records of one table in a single transaction"""
+        try:
+            rows = []
+            for data in records:
+                row = dict(data)
+                if pd.isna(row.get('week')):
+                    row['week'] = pd.Timestamp(row['date']).strftime("%Y-W%U")
+                rows.append(row)
+            self._upsert(table, rows)
+            return True
+        except Exception as e:
+            print(f"Error saving {table} batch: {e}")
+            return False
+    
+    def get_weekly_summary(self, week):
+        """Get summary data for a specific week using the week indexes"""
+        return build_weekly_summary(
+            week,
+            self.load_body_metrics(week=week),
+            self.load_workout_data(week=week),
+            self.load_diet_data(week=week)
+        )
+    
+    def reset_all_data(self):
+        """Reset all data by emptying every table"""
+        try:
+            with closing(self._connect()) as conn, conn:
+                for table in TABLE_COLUMNS:
+                    conn.execute(f"DELETE FROM {table}")
+            return True
+        except Exception as e:
+            print(f"Error resetting data: {e}")
+            return False
+    
+    def get_data_file_info(self):
+        """Get information about the database tables"""
+        info = {
+            'data_directory': os.path.abspath(self.data_dir),
+            'files': []
+        }
+        
+        size_bytes = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+        descriptions = {
+            'body_metrics': 'Body measurements and metrics',
+            'workout_data': 'Workout completion and progress',
+            'diet_data': 'Diet adherence and nutrition tracking'
+        }
+        
+        with closing(self._connect()) as conn:
+            for table, description in descriptions.items():
+                try:
+                    # Both answered from the primary key index
+                    row_count, min_date, max_date = conn.execute(
+                        f"SELECT COUNT(*), MIN(date), MAX(date) FROM {table}"
+                    ).fetchone()
+                except sqlite3.Error:
+                    row_count, min_date, max_date = 0, None, None
+                
+                info['files'].append({
+                    'name': table,
+                    'path': os.path.abspath(self.db_path),
+                    'description': description,
+                    'size_bytes': size_bytes,
+                    'row_count': row_count,
+                    'min_date': min_date,
+                    'max_date': max_date
+                })
+        
+        return info